@@ -0,0 +1,318 @@
+"""A local stand-in for Discord's REST API and gateway state, for the replay and load harness.
+
+:class:`FakeDiscord` replaces ``HTTPClient.request`` of a real discord.py client, so dispander and discord.py run
+unmodified down to the HTTP layer. Every request waits for a configurable latency, takes a slot of a per-route
+rate-limit bucket, may fail with an injected status and is answered from an in-memory message store.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import count
+from time import monotonic
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+import discord
+from discord.errors import DiscordServerError, Forbidden, HTTPException, NotFound
+from discord.ext import commands
+from discord.utils import time_snowflake, utcnow
+
+if TYPE_CHECKING:
+    from discord.http import Route
+
+GUILD_ID = 111111111111111111
+BOT_ID = 999999999999999999
+USER_IDS = tuple(333333333333333300 + i for i in range(50))
+
+ROUTE_CHANNEL = 'GET /channels/{channel_id}'
+ROUTE_SEND = 'POST /channels/{channel_id}/messages'
+ROUTE_GET = 'GET /channels/{channel_id}/messages/{message_id}'
+ROUTE_EDIT = 'PATCH /channels/{channel_id}/messages/{message_id}'
+ROUTE_DELETE = 'DELETE /channels/{channel_id}/messages/{message_id}'
+ROUTE_BULK_DELETE = 'POST /channels/{channel_id}/messages/bulk-delete'
+ROUTE_REACTION = 'PUT /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me'
+
+# (limit, seconds) per major parameter, roughly the buckets Discord reports for these routes.
+DEFAULT_BUCKETS: dict[str, tuple[int, float]] = {
+    ROUTE_SEND: (5, 5.0),
+    ROUTE_GET: (50, 1.0),
+    ROUTE_EDIT: (5, 5.0),
+    ROUTE_DELETE: (5, 1.0),
+    ROUTE_BULK_DELETE: (1, 1.0),
+    ROUTE_REACTION: (1, 0.25),
+}
+GLOBAL_LIMIT = (50, 1.0)
+
+# the JSON error codes of NotFound responses.
+UNKNOWN_CHANNEL = 10003
+UNKNOWN_MESSAGE = 10008
+
+
+class _Response(NamedTuple):
+    # the attributes HTTPException reads from an aiohttp response.
+    status: int
+    reason: str
+
+
+@dataclass
+class _Bucket:
+    limit: int
+    per: float
+    remaining: int
+    reset_at: float
+
+
+@dataclass
+class FakeDiscordStats:
+    """Counters of the requests served by a FakeDiscord."""
+
+    calls: Counter[str] = field(default_factory=Counter)
+    errors: Counter[str] = field(default_factory=Counter)
+    rate_limited: Counter[str] = field(default_factory=Counter)
+
+
+class FakeDiscord:
+    """Answers discord.py's REST requests from memory.
+
+    Args:
+        latency (float, optional): Mean seconds a request takes. Defaults to 0.05.
+        jitter (float, optional): The fraction by which latency varies uniformly. Defaults to 0.5.
+        buckets (dict[str, tuple[int, float]] | None, optional): Route key to (limit, seconds), counted per
+            channel. Defaults to DEFAULT_BUCKETS.
+        global_limit (tuple[int, float] | None, optional): The limit shared by every route. Defaults to 50 per second.
+        errors (dict[str, dict[int, float]] | None, optional): Route key, or ``'*'`` for every route, to the
+            probability of failing with each status. Defaults to None.
+        seed (int, optional): The seed of latency and error injection. Defaults to 0.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        latency: float = 0.05,
+        jitter: float = 0.5,
+        buckets: None | dict[str, tuple[int, float]] = None,
+        global_limit: None | tuple[int, float] = GLOBAL_LIMIT,
+        errors: None | dict[str, dict[int, float]] = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket_limits = DEFAULT_BUCKETS if buckets is None else buckets
+        self.global_limit = global_limit
+        self.errors = errors or {}
+        self.stats = FakeDiscordStats()
+        self.channels: dict[int, dict[str, Any]] = {}
+        self.messages: dict[int, dict[int, dict[str, Any]]] = {}
+        self.bot_messages: list[tuple[int, int]] = []
+        self._rng = random.Random(seed)  # noqa: S311
+        self._buckets: dict[str, _Bucket] = {}
+        self._snowflakes = count()
+        self._patterns: dict[str, re.Pattern[str]] = {}
+
+    def snowflake(self) -> int:
+        """A new snowflake of the current time, unique within this FakeDiscord."""
+        return time_snowflake(utcnow()) + next(self._snowflakes) % 4096
+
+    def install(self, client: discord.Client) -> None:
+        """Routes every REST request of client to this stand-in."""
+        client.http.request = self.request  # type: ignore[method-assign]
+
+    async def request(self, route: Route, **kwargs: Any) -> Any:  # noqa: ANN401
+        """The replacement of ``HTTPClient.request``."""
+        key = f'{route.method} {route.path}'
+        self.stats.calls[key] += 1
+        params = self._parse(route)
+
+        if self.global_limit is not None:
+            await self._take('global', *self.global_limit, key)
+        if key in self.bucket_limits:
+            await self._take(f'{key}:{params.get("channel_id")}', *self.bucket_limits[key], key)
+        await asyncio.sleep(self.latency * self._rng.uniform(1 - self.jitter, 1 + self.jitter))
+
+        for errors in (self.errors.get(key, {}), self.errors.get('*', {})):
+            for status, probability in errors.items():
+                if self._rng.random() < probability:
+                    self.stats.errors[f'{key} {status}'] += 1
+                    raise _error(status)
+        return self._handle(key, params, kwargs.get('json'))
+
+    def add_channel(self, channel_id: int, name: str, position: int = 0) -> dict[str, Any]:
+        """Stores a text channel of the guild and returns its payload."""
+        payload = channel_payload(channel_id, name, position)
+        self.channels[channel_id] = payload
+        return payload
+
+    def add_message(  # noqa: PLR0913
+        self,
+        channel_id: int,
+        author_id: int,
+        content: str,
+        *,
+        message_id: None | int = None,
+        attachments: int = 0,
+        embeds: None | list[dict[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """Stores a message and returns its payload."""
+        message_id = self.snowflake() if message_id is None else message_id
+        payload = message_payload(message_id, channel_id, author_id, content, attachments=attachments, embeds=embeds)
+        self.messages.setdefault(channel_id, {})[message_id] = payload
+        return payload
+
+    def _handle(self, key: str, params: dict[str, str], json: None | dict[str, Any]) -> Any:  # noqa: ANN401
+        if key == ROUTE_CHANNEL:
+            return self._get_channel(int(params['channel_id']))
+        if key not in (ROUTE_SEND, ROUTE_GET, ROUTE_EDIT, ROUTE_DELETE, ROUTE_BULK_DELETE, ROUTE_REACTION):
+            # answer like Discord does for an unknown route, rather than failing inside the fake.
+            raise _error(404)
+
+        channel_id = int(params['channel_id'])
+        channel = self.messages.setdefault(channel_id, {})
+        if key == ROUTE_SEND:
+            assert json is not None
+            payload = self.add_message(channel_id, BOT_ID, json.get('content') or '', embeds=json.get('embeds'))
+            payload['components'] = json.get('components') or []
+            self.bot_messages.append((channel_id, int(payload['id'])))
+            return payload
+        if key == ROUTE_BULK_DELETE:
+            assert json is not None
+            for message_id in json['messages']:
+                channel.pop(int(message_id), None)
+            return None
+
+        message_id = int(params['message_id'])
+        if message_id not in channel:
+            raise _error(404, UNKNOWN_MESSAGE)
+        if key == ROUTE_GET:
+            return channel[message_id]
+        if key == ROUTE_EDIT:
+            assert json is not None
+            channel[message_id] = {**channel[message_id], **json, 'edited_timestamp': utcnow().isoformat()}
+            return channel[message_id]
+        if key == ROUTE_DELETE:
+            del channel[message_id]
+        return None
+
+    def _get_channel(self, channel_id: int) -> dict[str, Any]:
+        if channel_id not in self.channels:
+            raise _error(404, UNKNOWN_CHANNEL)
+        return self.channels[channel_id]
+
+    def _parse(self, route: Route) -> dict[str, str]:
+        pattern = self._patterns.get(route.path)
+        if pattern is None:
+            pattern = re.compile(re.sub(r'\\{(\w+)\\}', r'(?P<\1>[^/]+)', re.escape(route.BASE + route.path)) + '$')
+            self._patterns[route.path] = pattern
+        match = pattern.match(route.url)
+        return {} if match is None else match.groupdict()
+
+    async def _take(self, name: str, limit: int, per: float, key: str) -> None:
+        # discord.py waits for a bucket to reset instead of sending a request that would be rate limited.
+        while True:
+            now = monotonic()
+            bucket = self._buckets.get(name)
+            if bucket is None or bucket.reset_at <= now:
+                bucket = self._buckets[name] = _Bucket(limit, per, limit, now + per)
+            if bucket.remaining > 0:
+                bucket.remaining -= 1
+                return
+            self.stats.rate_limited[key] += 1
+            await asyncio.sleep(bucket.reset_at - now)
+
+
+def _error(status: int, code: int = 0) -> HTTPException:
+    response = _Response(status, 'injected')
+    message = {'code': code, 'message': 'injected by FakeDiscord'}
+    if status == 403:
+        return Forbidden(response, message)  # type: ignore[arg-type]
+    if status == 404:
+        return NotFound(response, message)  # type: ignore[arg-type]
+    if status >= 500:
+        return DiscordServerError(response, message)  # type: ignore[arg-type]
+    return HTTPException(response, message)  # type: ignore[arg-type]
+
+
+def user_payload(user_id: int, *, bot: bool = False) -> dict[str, Any]:
+    return {
+        'id': str(user_id),
+        'username': f'user{user_id % 1000}',
+        'global_name': None,
+        'discriminator': '0',
+        'avatar': None,
+        'bot': bot,
+    }
+
+
+def channel_payload(channel_id: int, name: str, position: int = 0) -> dict[str, Any]:
+    return {'id': str(channel_id), 'guild_id': str(GUILD_ID), 'type': 0, 'name': name, 'position': position}
+
+
+def message_payload(  # noqa: PLR0913
+    message_id: int,
+    channel_id: int,
+    author_id: int,
+    content: str,
+    *,
+    attachments: int = 0,
+    embeds: None | list[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    return {
+        'id': str(message_id),
+        'channel_id': str(channel_id),
+        'guild_id': str(GUILD_ID),
+        'author': user_payload(author_id, bot=author_id == BOT_ID),
+        'content': content,
+        'timestamp': utcnow().isoformat(),
+        'edited_timestamp': None,
+        'tts': False,
+        'mention_everyone': False,
+        'mentions': [],
+        'mention_roles': [],
+        'attachments': [
+            {
+                'id': str(message_id + i),
+                'filename': f'image{i}.png',
+                'size': 1024,
+                'url': f'https://cdn.discordapp.com/attachments/{channel_id}/{message_id + i}/image{i}.png',
+                'proxy_url': f'https://media.discordapp.net/attachments/{channel_id}/{message_id + i}/image{i}.png',
+                'content_type': 'image/png',
+            }
+            for i in range(attachments)
+        ],
+        'embeds': embeds or [],
+        'pinned': False,
+        'type': 0,
+    }
+
+
+def make_bot(channels: int, fake: None | FakeDiscord = None) -> tuple[commands.Bot, discord.Guild]:
+    """A bot that never connects, whose state holds one guild with channels text channels.
+
+    The channels are also stored in fake, so it can answer channel fetches.
+    """
+    intents = discord.Intents(guilds=True, members=True, guild_messages=True, message_content=True)
+    bot = commands.Bot(command_prefix='!', intents=intents)
+    state = bot._connection
+    state.user = discord.ClientUser(state=state, data=user_payload(BOT_ID, bot=True))  # type: ignore[arg-type]
+    # a partial GUILD_CREATE payload, enough for the guild, its channels and the bot member.
+    data: Any = {
+        'id': str(GUILD_ID),
+        'name': 'load test',
+        'icon': None,
+        'owner_id': str(USER_IDS[0]),
+        'roles': [{'id': str(GUILD_ID), 'name': '@everyone', 'permissions': str(discord.Permissions.all().value)}],
+        'channels': [channel_payload(GUILD_ID + 1 + i, f'channel-{i}', i) for i in range(channels)],
+        'members': [
+            {'user': user_payload(BOT_ID, bot=True), 'roles': [], 'joined_at': utcnow().isoformat(), 'flags': 0}
+        ],
+        'member_count': 1,
+    }
+    guild = discord.Guild(data=data, state=state)
+    state._add_guild(guild)
+    if fake is not None:
+        for channel in data['channels']:
+            fake.add_channel(int(channel['id']), channel['name'], channel['position'])
+    return bot, guild
@@ -0,0 +1,140 @@
+"""Lightweight offline stand-ins for the discord.py models that dispander reads.
+
+They carry only the attributes dispander touches, so the benchmarks measure dispander and not discord.py's
+model construction. Ids are realistic snowflakes so regex and URL code sees realistic input.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+
+import discord
+
+GUILD_ID = 111111111111111111
+CHANNEL_ID = 222222222222222222
+BOT_ID = 999999999999999999
+
+
+@dataclass
+class FakeAsset:
+    url: str
+
+
+@dataclass
+class FakeUser:
+    id: int
+    name: str
+    display_name: str
+    avatar: FakeAsset | None
+    bot: bool = False
+
+    @property
+    def display_avatar(self) -> FakeAsset:
+        return self.avatar or FakeAsset('https://cdn.discordapp.com/embed/avatars/0.png')
+
+
+@dataclass
+class FakeGuild:
+    id: int
+    name: str
+    icon: FakeAsset | None
+    channels: dict[int, FakeChannel] = field(default_factory=dict)
+
+    def get_channel_or_thread(self, channel_id: int) -> FakeChannel | None:
+        return self.channels.get(channel_id)
+
+
+@dataclass
+class FakeChannel:
+    id: int
+    name: str
+    guild: FakeGuild
+
+
+@dataclass
+class FakeAttachment:
+    id: int
+    filename: str
+    content_type: str | None
+    proxy_url: str
+    url: str
+
+
+@dataclass
+class FakeMessage:
+    id: int
+    content: str
+    author: FakeUser
+    guild: FakeGuild
+    channel: FakeChannel
+    attachments: list[FakeAttachment] = field(default_factory=list)
+    embeds: list[discord.Embed] = field(default_factory=list)
+    created_at: datetime = field(default_factory=lambda: datetime(2024, 1, 1, tzinfo=UTC))
+    edited_at: datetime | None = None
+
+    @property
+    def jump_url(self) -> str:
+        return f'https://discord.com/channels/{self.guild.id}/{self.channel.id}/{self.id}'
+
+
+def make_guild() -> FakeGuild:
+    guild = FakeGuild(GUILD_ID, 'bench guild', FakeAsset('https://cdn.discordapp.com/icons/1/a.png'))
+    guild.channels[CHANNEL_ID] = FakeChannel(CHANNEL_ID, 'general', guild)
+    return guild
+
+
+def make_user(user_id: int = 333333333333333333) -> FakeUser:
+    return FakeUser(user_id, 'user', 'User', FakeAsset(f'https://cdn.discordapp.com/avatars/{user_id}/a.png'))
+
+
+def make_attachment(attachment_id: int, content_type: str | None = 'image/png') -> FakeAttachment:
+    url = f'https://cdn.discordapp.com/attachments/{CHANNEL_ID}/{attachment_id}/image.png'
+    return FakeAttachment(attachment_id, 'image.png', content_type, url.replace('cdn', 'media'), url)
+
+
+def make_message(
+    message_id: int = 444444444444444444,
+    content: str = 'hello world',
+    attachments: int = 0,
+    guild: FakeGuild | None = None,
+) -> FakeMessage:
+    guild = guild or make_guild()
+    return FakeMessage(
+        id=message_id,
+        content=content,
+        author=make_user(),
+        guild=guild,
+        channel=guild.channels[CHANNEL_ID],
+        attachments=[make_attachment(message_id + i) for i in range(attachments)],
+    )
+
+
+def make_client() -> discord.Client:
+    """A real Client that never connects. Dispander requires a discord.Client instance."""
+    return discord.Client(intents=discord.Intents.none())
+
+
+_WORDS = (  # noqa: SIM905
+    'the a to and of is it you that in for on this lol ok yes no maybe please thanks check look at '
+    'meeting tomorrow release bug fix deploy server channel message link here there what why how'
+).split()
+
+
+def message_url(rng: random.Random) -> str:
+    return f'https://discord.com/channels/{GUILD_ID}/{CHANNEL_ID}/{rng.randrange(10**17, 10**18)}'
+
+
+def chat_corpus(size: int, link_ratio: float = 0.01, seed: int = 0) -> list[str]:
+    """Synthetic chat lines. About link_ratio of them contain a message link, the rest contain none."""
+    rng = random.Random(seed)  # noqa: S311
+    corpus: list[str] = []
+    for _ in range(size):
+        words = rng.choices(_WORDS, k=rng.randint(1, 30))
+        if rng.random() < link_ratio:
+            words.insert(rng.randrange(len(words) + 1), message_url(rng))
+        elif rng.random() < 0.05:
+            words.append('https://example.com/some/other/link')
+        corpus.append(' '.join(words))
+    return corpus
@@ -0,0 +1,179 @@
+"""Offline microbenchmarks for dispander's pure hot paths.
+
+Run from the repository root::
+
+    python -m benchmarks.hot_paths [--json results.json] [--filter NAME] [--repeat 5]
+
+Each benchmark reports the best and median seconds per call. ``--json`` writes the same results in a
+machine-readable form so they can be compared across releases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import timeit
+from importlib.metadata import PackageNotFoundError, version
+from typing import TYPE_CHECKING, Any
+
+from dispander.core import REGEX_DISCORD_MESSAGE_URL, Dispander, FromJumpUrl, LinkedMessageView
+from dispander.customizable import (
+    AttachmentCustomized,
+    ChannelCustomized,
+    CustomizableDispander,
+    Customizer,
+    GuildCustomized,
+    MessageCustomized,
+)
+from dispander.packing import pack_embeds
+
+from .fakes import chat_corpus, make_client, make_message
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str) -> Callable[[Callable[[], Callable[[], object]]], Callable[[], Callable[[], object]]]:
+    """Registers a setup function that returns the callable to time."""
+
+    def decorator(setup: Callable[[], Callable[[], object]]) -> Callable[[], Callable[[], object]]:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def _scan(corpus: list[str]) -> Callable[[], object]:
+    finditer = REGEX_DISCORD_MESSAGE_URL.finditer
+
+    def run() -> object:
+        return [m for line in corpus for m in finditer(line)]
+
+    return run
+
+
+@benchmark('regex_scan.no_links')
+def regex_scan_no_links() -> Callable[[], object]:
+    return _scan(chat_corpus(1000, link_ratio=0.0))
+
+
+@benchmark('regex_scan.realistic')
+def regex_scan_realistic() -> Callable[[], object]:
+    return _scan(chat_corpus(1000, link_ratio=0.01))
+
+
+@benchmark('regex_scan.link_dump')
+def regex_scan_link_dump() -> Callable[[], object]:
+    return _scan(chat_corpus(1000, link_ratio=1.0))
+
+
+def _view(attachments: int = 0) -> LinkedMessageView:
+    message: Any = make_message(attachments=attachments)
+    return LinkedMessageView.from_message(message)
+
+
+@benchmark('linked_message_view.from_message')
+def linked_message_view_from_message() -> Callable[[], object]:
+    message: Any = make_message(attachments=1)
+    return lambda: LinkedMessageView.from_message(message)
+
+
+@benchmark('compose_embed.text')
+def compose_embed_text() -> Callable[[], object]:
+    dispander = Dispander(make_client())
+    view = _view()
+    return lambda: dispander._compose_embed(view)
+
+
+@benchmark('compose_embed.image')
+def compose_embed_image() -> Callable[[], object]:
+    dispander = Dispander(make_client())
+    view = _view(attachments=1)
+    return lambda: dispander._compose_embed(view)
+
+
+@benchmark('build_embeds.ten_images')
+def build_embeds_ten_images() -> Callable[[], object]:
+    dispander = Dispander(make_client())
+    view = _view(attachments=10)
+    return lambda: dispander._build_embeds(view)
+
+
+@benchmark('jump_url.round_trip')
+def jump_url_round_trip() -> Callable[[], object]:
+    dispander = Dispander(make_client())
+    target = _view()
+    data = FromJumpUrl(target.author_id, 555555555555555555, [666666666666666666 + i for i in range(3)])
+
+    def run() -> object:
+        return dispander._from_jump_url(dispander._make_jump_url(target.jump_url, data))
+
+    return run
+
+
+@benchmark('pack_embeds.five_links')
+def pack_embeds_five_links() -> Callable[[], object]:
+    dispander = Dispander(make_client())
+    expansions = [dispander._build_embeds(_view(attachments=i)) for i in range(5)]
+    return lambda: pack_embeds(expansions)
+
+
+@benchmark('customizable.apply_customized')
+def customizable_apply_customized() -> Callable[[], object]:
+    dispander = CustomizableDispander(make_client(), Customizer())
+    view = _view(attachments=1)
+    extra = MessageCustomized(content='customized', author_avatar_url='https://example.com/a.png', author_name='n')
+    guild_extra = GuildCustomized(icon_url='https://example.com/i.png')
+    channel_extra = ChannelCustomized(name='renamed')
+    attachments = [AttachmentCustomized(proxy_url='https://example.com/p.png')]
+
+    def run() -> object:
+        return dispander._apply_customized(view, extra, guild_extra, channel_extra, attachments)
+
+    return run
+
+
+def measure(func: Callable[[], object], repeat: int) -> dict[str, float | int]:
+    """Times func with timeit and returns per-call seconds."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    timings = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {'number': number, 'best': min(timings), 'median': statistics.median(timings)}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--json', metavar='PATH', help='write the results to PATH as JSON')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5, help='timing repetitions per benchmark')
+    args = parser.parse_args(argv)
+
+    results: dict[str, dict[str, float | int]] = {}
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(setup(), args.repeat)
+        print(f'{name:40} best {results[name]["best"] * 1e6:10.3f} us  median {results[name]["median"] * 1e6:10.3f} us')
+
+    if args.json:
+        try:
+            dispander_version = version('dispander')
+        except PackageNotFoundError:
+            dispander_version = None
+        report = {
+            'dispander': dispander_version,
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:  # noqa: PTH123
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
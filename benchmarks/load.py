@@ -0,0 +1,355 @@
+"""Replay and load harness for ExpandDiscordMessageFromUrlCog and CustomizableDispander.
+
+Gateway events are replayed at a fixed rate against a bot whose REST requests are answered by
+:class:`~benchmarks.fake_discord.FakeDiscord`. Run from the repository root::
+
+    python -m benchmarks.load [--events 1000] [--rate 50] [--target cog|customizable] [--json results.json]
+    python -m benchmarks.load --record events.jsonl   # save the synthetic stream
+    python -m benchmarks.load --replay events.jsonl   # replay a recorded or hand-written stream
+
+Each line of an event stream is a JSON object. ``{"type": "message", "author_id": ..., "channel": ...,
+"content": ...}`` is dispatched as ``on_message``; ``{"type": "reaction", "user_id": ..., "target": "expansion"}``
+is dispatched as ``on_raw_reaction_add`` by its author on the oldest expansion, or by user_id on a seeded message
+for ``"other"``.
+``channel`` is an index into the guild's text channels. Links may use ``{history:N}`` to refer to the N-th
+seeded message and ``{recent:N}`` to the N-th most recent replayed message.
+
+The report has the throughput, latency percentiles per event type, REST calls per event and peak traced memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import statistics
+import tracemalloc
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+import discord
+
+from dispander.cogs import ExpandDiscordMessageFromUrlCog
+from dispander.customizable import CustomizableDispander, Customizer, MessageCustomized
+from dispander.scheduler import OutboundScheduler
+
+from .fake_discord import GUILD_ID, USER_IDS, FakeDiscord, make_bot, message_payload
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator
+
+    from discord.ext import commands
+
+    from dispander.core import Dispander
+
+DELETE_EMOJI = '\U0001f5d1'
+_PLACEHOLDER = re.compile(r'\{(history|recent):(\d+)\}')
+
+
+def synthetic_events(  # noqa: PLR0913
+    count: int,
+    *,
+    channels: int,
+    history: int,
+    link_ratio: float = 0.3,
+    recent_ratio: float = 0.3,
+    reaction_ratio: float = 0.05,
+    seed: int = 0,
+) -> Iterator[dict[str, Any]]:
+    """Chat where link_ratio of the messages link one to three messages, and some expansions get deleted."""
+    rng = random.Random(seed)  # noqa: S311
+    for i in range(count):
+        if i and rng.random() < reaction_ratio:
+            target = 'expansion' if rng.random() < 0.8 else 'other'
+            yield {'type': 'reaction', 'user_id': rng.choice(USER_IDS), 'target': target}
+            continue
+        words = ['message', str(i)]
+        if rng.random() < link_ratio:
+            for _ in range(rng.randint(1, 3)):
+                if i and rng.random() < recent_ratio:
+                    words.append(f'{{recent:{rng.randrange(min(i, 50))}}}')
+                else:
+                    words.append(f'{{history:{rng.randrange(history)}}}')
+        yield {
+            'type': 'message',
+            'author_id': rng.choice(USER_IDS),
+            'channel': rng.randrange(channels),
+            'content': ' '.join(words),
+        }
+
+
+@dataclass
+class Report:
+    """What a run measured."""
+
+    events: int = 0
+    seconds: float = 0.0
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    failures: dict[str, int] = field(default_factory=dict)
+    peak_memory: int = 0
+
+    def summary(self, fake: FakeDiscord) -> dict[str, Any]:
+        calls = sum(fake.stats.calls.values())
+        return {
+            'events': self.events,
+            'seconds': self.seconds,
+            'throughput': self.events / self.seconds if self.seconds else 0.0,
+            'latency': {kind: _percentiles(values) for kind, values in self.latencies.items()},
+            'failures': self.failures,
+            'api_calls': calls,
+            'api_calls_per_event': calls / self.events if self.events else 0.0,
+            'api_calls_by_route': dict(fake.stats.calls),
+            'rate_limited': dict(fake.stats.rate_limited),
+            'injected_errors': dict(fake.stats.errors),
+            'peak_memory_bytes': self.peak_memory,
+        }
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) < 2:
+        return dict.fromkeys(('p50', 'p90', 'p99', 'max'), values[0] if values else 0.0)
+    quantiles = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': quantiles[49], 'p90': quantiles[89], 'p99': quantiles[98], 'max': max(values)}
+
+
+class Harness:
+    """Replays events against a handler set built on a bot wired to a FakeDiscord.
+
+    Args:
+        fake (FakeDiscord): The REST stand-in.
+        target (str): ``'cog'`` for ExpandDiscordMessageFromUrlCog or ``'customizable'`` for a
+            CustomizableDispander with a message customizer that waits customizer_latency seconds.
+        channels (int): The number of text channels.
+        history (int): The number of messages seeded in the fake store before the run.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        fake: FakeDiscord,
+        *,
+        target: str = 'cog',
+        channels: int = 5,
+        history: int = 500,
+        customizer_latency: float = 0.01,
+        scheduler: bool = False,
+    ) -> None:
+        self.fake = fake
+        self.bot, self.guild = make_bot(channels, fake)
+        fake.install(self.bot)
+        self.channels = self.guild.text_channels
+        rng = random.Random(0)  # noqa: S311
+        self.history = [
+            fake.add_message(
+                self.channels[i % channels].id,
+                rng.choice(USER_IDS),
+                f'history {i}',
+                attachments=rng.choice((0, 0, 0, 1, 4)),
+            )
+            for i in range(history)
+        ]
+        self.recent: list[discord.Message] = []
+        self.dispander: Dispander
+        self.on_message, self.on_reaction = self._handlers(target, customizer_latency, scheduler)
+
+    def _handlers(
+        self,
+        target: str,
+        customizer_latency: float,
+        scheduler: bool,
+    ) -> tuple[
+        Callable[[discord.Message], Awaitable[None]], Callable[[discord.RawReactionActionEvent], Awaitable[None]]
+    ]:
+        bot: commands.Bot = self.bot
+        if target == 'cog':
+            cog = ExpandDiscordMessageFromUrlCog(bot)
+            if scheduler:
+                cog.dispander.scheduler = OutboundScheduler()
+            self.dispander = cog.dispander
+            return cog.on_message, cog.on_raw_reaction_add
+
+        async def customize(message: discord.Message) -> MessageCustomized:
+            await asyncio.sleep(customizer_latency)  # e.g. a database lookup
+            return MessageCustomized(author_name=message.author.display_name.upper())
+
+        dispander = CustomizableDispander(
+            bot,
+            Customizer().set_message(customize),
+            scheduler=OutboundScheduler() if scheduler else None,
+        )
+        self.dispander = dispander
+
+        async def on_message(message: discord.Message) -> None:
+            if not message.author.bot:
+                await dispander.dispand(message)
+
+        async def on_reaction(payload: discord.RawReactionActionEvent) -> None:
+            await dispander.delete_dispand(payload=payload)
+
+        return on_message, on_reaction
+
+    async def run(self, events: list[dict[str, Any]], rate: float) -> Report:
+        """Dispatches events rate per second and waits for every handler to finish."""
+        report = Report()
+        tasks: list[asyncio.Task[None]] = []
+        tracemalloc.start()
+        start = perf_counter()
+        for i, event in enumerate(events):
+            delay = start + i / rate - perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            dispatch = self._dispatch(event)
+            if dispatch is not None:
+                tasks.append(asyncio.create_task(self._timed(report, event['type'], dispatch)))
+        await asyncio.gather(*tasks)
+        report.seconds = perf_counter() - start
+        report.peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report.events = len(tasks)
+        return report
+
+    async def _timed(self, report: Report, kind: str, dispatch: Awaitable[None]) -> None:
+        start = perf_counter()
+        try:
+            await dispatch
+        except Exception as e:  # noqa: BLE001 # reported, like discord.py logs errors of event handlers
+            key = f'{kind} {type(e).__name__}'
+            report.failures[key] = report.failures.get(key, 0) + 1
+        report.latencies.setdefault(kind, []).append(perf_counter() - start)
+
+    def _dispatch(self, event: dict[str, Any]) -> None | Awaitable[None]:
+        if event['type'] == 'message':
+            return self.on_message(self._message(event))
+        if event['type'] == 'reaction':
+            payload = self._reaction(event)
+            return None if payload is None else self.on_reaction(payload)
+        raise ValueError(f'unknown event type {event["type"]!r}')
+
+    def _message(self, event: dict[str, Any]) -> discord.Message:
+        channel = self.channels[event.get('channel', 0) % len(self.channels)]
+        content = _PLACEHOLDER.sub(self._link, event['content'])
+        data = message_payload(self.fake.snowflake(), channel.id, event['author_id'], content)
+        message = self.bot._connection.create_message(channel=channel, data=data)  # type: ignore[arg-type]
+        # the gateway stores received messages in the client's message cache.
+        assert self.bot._connection._messages is not None
+        self.bot._connection._messages.append(message)
+        self.recent.append(message)
+        return message
+
+    def _link(self, match: re.Match[str]) -> str:
+        kind, index = match[1], int(match[2])
+        if kind == 'recent' and self.recent:
+            message = self.recent[-1 - index % len(self.recent)]
+            channel_id, message_id = message.channel.id, message.id
+        else:
+            payload = self.history[index % len(self.history)]
+            channel_id, message_id = int(payload['channel_id']), int(payload['id'])
+        return f'https://discord.com/channels/{GUILD_ID}/{channel_id}/{message_id}'
+
+    def _reaction(self, event: dict[str, Any]) -> None | discord.RawReactionActionEvent:
+        if event['target'] == 'expansion':
+            # the author of the expanded message is allowed to delete the expansion.
+            if not self.fake.bot_messages:
+                return None
+            channel_id, message_id = self.fake.bot_messages.pop(0)
+            expansion = self.dispander.expansion_index.get(message_id)
+            if expansion is None:
+                return None  # an overflow message, or already deleted
+            user_id = expansion.author_id
+        else:
+            payload = random.choice(self.history)  # noqa: S311
+            channel_id, message_id, user_id = int(payload['channel_id']), int(payload['id']), event['user_id']
+        data = {
+            'message_id': str(message_id),
+            'channel_id': str(channel_id),
+            'user_id': str(user_id),
+            'guild_id': str(GUILD_ID),
+            'type': 0,
+        }
+        emoji = discord.PartialEmoji(name=DELETE_EMOJI)
+        return discord.RawReactionActionEvent(data, emoji, 'REACTION_ADD')  # type: ignore[arg-type]
+
+
+def _parse_errors(specs: list[str]) -> dict[str, dict[int, float]]:
+    # 'ROUTE=STATUS:PROBABILITY', e.g. '*=500:0.01' or 'GET /channels/{channel_id}/messages/{message_id}=404:0.05'
+    errors: dict[str, dict[int, float]] = {}
+    for spec in specs:
+        route, _, injected = spec.rpartition('=')
+        status, _, probability = injected.partition(':')
+        errors.setdefault(route or '*', {})[int(status)] = float(probability)
+    return errors
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000, help='number of synthetic events')
+    parser.add_argument('--rate', type=float, default=50.0, help='events dispatched per second')
+    parser.add_argument('--target', choices=('cog', 'customizable'), default='cog')
+    parser.add_argument('--channels', type=int, default=5)
+    parser.add_argument('--history', type=int, default=500, help='messages seeded before the run')
+    parser.add_argument('--latency', type=float, default=0.05, help='mean seconds per REST request')
+    parser.add_argument('--jitter', type=float, default=0.5)
+    parser.add_argument('--no-rate-limits', action='store_true', help='disable every rate-limit bucket')
+    parser.add_argument('--inject', action='append', default=[], metavar='ROUTE=STATUS:P', help='inject errors')
+    parser.add_argument('--customizer-latency', type=float, default=0.01)
+    parser.add_argument('--scheduler', action='store_true', help='post through an OutboundScheduler')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record', metavar='PATH', help='write the synthetic events to PATH and exit')
+    parser.add_argument('--replay', metavar='PATH', help='replay the events in PATH instead of synthetic ones')
+    parser.add_argument('--json', metavar='PATH', help='write the report to PATH as JSON')
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with open(args.replay, encoding='utf-8') as f:  # noqa: PTH123
+            events = [json.loads(line) for line in f if line.strip()]
+    else:
+        events = list(synthetic_events(args.events, channels=args.channels, history=args.history, seed=args.seed))
+    if args.record:
+        with open(args.record, 'w', encoding='utf-8') as f:  # noqa: PTH123
+            f.writelines(json.dumps(event) + '\n' for event in events)
+        return
+
+    async def run() -> dict[str, Any]:
+        fake = FakeDiscord(
+            latency=args.latency,
+            jitter=args.jitter,
+            buckets={} if args.no_rate_limits else None,
+            global_limit=None if args.no_rate_limits else (50, 1.0),
+            errors=_parse_errors(args.inject),
+            seed=args.seed,
+        )
+        harness = Harness(
+            fake,
+            target=args.target,
+            channels=args.channels,
+            history=args.history,
+            customizer_latency=args.customizer_latency,
+            scheduler=args.scheduler,
+        )
+        report = await harness.run(events, args.rate)
+        return report.summary(fake)
+
+    summary = asyncio.run(run())
+    print(f'{summary["events"]} events in {summary["seconds"]:.2f}s ({summary["throughput"]:.1f}/s)')
+    for kind, latency in summary['latency'].items():
+        print(f'  {kind:10} ' + '  '.join(f'{name} {seconds * 1e3:8.1f} ms' for name, seconds in latency.items()))
+    print(f'  api calls  {summary["api_calls"]} ({summary["api_calls_per_event"]:.2f} per event)')
+    for route, calls in sorted(summary['api_calls_by_route'].items()):
+        print(f'    {calls:6}  {route}')
+    if summary['rate_limited']:
+        print(f'  rate limited waits {sum(summary["rate_limited"].values())}')
+    if summary['injected_errors']:
+        print(f'  injected errors {summary["injected_errors"]}')
+    if summary['failures']:
+        print(f'  handler failures {summary["failures"]}')
+    print(f'  peak memory {summary["peak_memory_bytes"] / 1024:.0f} KiB')
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:  # noqa: PTH123
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import asyncio
+import pickle
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import time
+from typing import TYPE_CHECKING, Any, Generic, Protocol, TypeVar
+
+from .cache import CacheStats, LRUCache
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from os import PathLike
+
+__all__ = ('CacheBackend', 'MemoryCacheBackend', 'SQLiteCacheBackend', 'Serializer')
+
+T = TypeVar('T')
+V = TypeVar('V')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    written_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_written_at ON cache (written_at);
+"""
+
+
+class CacheBackend(Protocol[V]):
+    """The storage behind dispander's message cache and customizer caches.
+
+    Keys are strings namespaced by their user, e.g. ``message:<channel id>:<message id>``, so one backend can be
+    shared by a Dispander and every cached customizer.
+    """
+
+    async def get(self, key: str) -> None | V:
+        """Returns the value stored for key, or None."""
+        ...
+
+    async def set(self, key: str, value: V) -> None:
+        """Stores value for key."""
+        ...
+
+    async def delete(self, key: str) -> None:
+        """Removes key if it is stored."""
+        ...
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters of this process."""
+        ...
+
+
+class Serializer(Protocol):
+    """Converts cached values to bytes and back. The :mod:`pickle` module satisfies this protocol."""
+
+    def dumps(self, obj: Any, /) -> bytes:  # noqa: ANN401
+        """Serializes obj."""
+        ...
+
+    def loads(self, data: bytes, /) -> Any:  # noqa: ANN401
+        """Deserializes data."""
+        ...
+
+
+class MemoryCacheBackend(Generic[V]):
+    """A CacheBackend private to this process, backed by an :class:`~dispander.cache.LRUCache`.
+
+    Args:
+        maxsize (int): The maximum number of entries. 0 disables the cache.
+        ttl (float | None, optional): Seconds an entry stays valid. None means no expiry. Defaults to None.
+    """
+
+    def __init__(self, maxsize: int, ttl: None | float = None) -> None:
+        self.cache: LRUCache[str, V] = LRUCache(maxsize, ttl)
+
+    async def get(self, key: str) -> None | V:
+        """Returns the value stored for key, or None."""
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: V) -> None:
+        """Stores value for key."""
+        self.cache.set(key, value)
+
+    async def delete(self, key: str) -> None:
+        """Removes key if it is stored."""
+        self.cache.pop(key)
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters."""
+        return self.cache.stats
+
+
+class SQLiteCacheBackend(Generic[V]):
+    """A CacheBackend in an SQLite database in WAL mode, shared by every process that opens the same file.
+
+    Each process runs its database calls on one dedicated thread, so the event loop never blocks on disk I/O.
+    When the table outgrows maxsize, the oldest written entries are evicted.
+
+    Args:
+        path (str | PathLike[str]): The database file. Every process sharing the cache must use the same path.
+        maxsize (int, optional): The maximum number of entries. Defaults to 10000.
+        ttl (float | None, optional): Seconds an entry stays valid. None means no expiry. Defaults to None.
+        serializer (Serializer, optional): Converts values to bytes. Defaults to :mod:`pickle`, so only share
+            the database file with processes you trust.
+        trim_interval (int, optional): The number of writes between evictions. Defaults to 100.
+    """
+
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        *,
+        maxsize: int = 10000,
+        ttl: None | float = None,
+        serializer: Serializer = pickle,
+        trim_interval: int = 100,
+    ) -> None:
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.serializer = serializer
+        self.trim_interval = trim_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dispander-cache')
+        self._connection: None | sqlite3.Connection = None
+        self._writes = 0
+        self._stats = CacheStats()
+
+    async def get(self, key: str) -> None | V:
+        """Returns the value stored for key, or None."""
+        data = await self._run(self._select, key, time())
+        if data is None:
+            self._stats.misses += 1
+            return None
+        self._stats.hits += 1
+        return self.serializer.loads(data)  # type: ignore[no-any-return]
+
+    async def set(self, key: str, value: V) -> None:
+        """Stores value for key."""
+        now = time()
+        expires_at = float('inf') if self.ttl is None else now + self.ttl
+        self._writes += 1
+        trim = self._writes % self.trim_interval == 0
+        await self._run(self._insert, key, self.serializer.dumps(value), expires_at, now, trim)
+
+    async def delete(self, key: str) -> None:
+        """Removes key if it is stored."""
+        await self._run(self._delete, key)
+
+    async def close(self) -> None:
+        """Closes the database."""
+        await self._run(self._close)
+        self._executor.shutdown()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Hit, miss and eviction counters of this process. size is the row count at the last eviction."""
+        return CacheStats(**vars(self._stats))
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args))
+
+    # the methods below run on the cache thread.
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=5.0)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def _select(self, key: str, now: float) -> None | bytes:
+        row = self._connect().execute('SELECT value FROM cache WHERE key = ? AND expires_at > ?', (key, now)).fetchone()
+        return None if row is None else row[0]
+
+    def _insert(self, key: str, value: bytes, expires_at: float, now: float, trim: bool) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)', (key, value, expires_at, now))
+            if not trim:
+                return
+            expired = connection.execute('DELETE FROM cache WHERE expires_at <= ?', (now,)).rowcount
+            (size,) = connection.execute('SELECT COUNT(*) FROM cache').fetchone()
+            overflow = max(0, size - self.maxsize)
+            if overflow:
+                connection.execute(
+                    'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY written_at LIMIT ?)', (overflow,)
+                )
+        self._stats.evictions += expired + overflow
+        self._stats.size = size - overflow
+
+    def _delete(self, key: str) -> None:
+        connection = self._connect()
+        with connection:
+            connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from time import monotonic
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+
+__all__ = ('CacheStats', 'LRUCache', 'SingleFlight')
+
+K = TypeVar('K', bound='Hashable')
+V = TypeVar('V')
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters reported by a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+
+
+class LRUCache(Generic[K, V]):
+    """A bounded mapping with least-recently-used eviction and an optional time-to-live.
+
+    Args:
+        maxsize (int): The maximum number of entries. 0 disables the cache.
+        ttl (float | None, optional): Seconds an entry stays valid. None means no expiry. Defaults to None.
+    """
+
+    def __init__(self, maxsize: int, ttl: None | float = None) -> None:
+        if maxsize < 0:
+            raise ValueError('maxsize must be zero or more')
+        if ttl is not None and ttl <= 0:
+            raise ValueError('ttl must be positive')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        """The number of stored entries, including ones that expired but were not looked up yet."""
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        """Whether key has a live entry. Does not touch the counters or the LRU order."""
+        return self._lookup(key) is not _MISSING
+
+    def _lookup(self, key: K) -> object:
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            return _MISSING
+        if expires_at < monotonic():
+            del self._data[key]
+            return _MISSING
+        return value
+
+    def get(self, key: K) -> None | V:
+        """Returns the cached value for key, or None. Counts a hit or a miss."""
+        value = self._lookup(key)
+        if value is _MISSING:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._data.move_to_end(key)
+        return value  # type: ignore[return-value]
+
+    def set(self, key: K, value: V) -> None:
+        """Stores value for key, evicting the least recently used entries if the cache is full."""
+        if self.maxsize == 0:
+            return
+        expires_at = float('inf') if self.ttl is None else monotonic() + self.ttl
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def pop(self, key: K) -> None | V:
+        """Removes key and returns its value, or None if it was not cached."""
+        entry = self._data.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """Removes every entry. Counters are kept."""
+        self._data.clear()
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the hit, miss and eviction counters."""
+        return CacheStats(hits=self._hits, misses=self._misses, evictions=self._evictions, size=len(self._data))
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls for the same key into one running task.
+
+    Callers that arrive while a call for their key is in flight await the same result instead of starting
+    another call. Cancelling one caller does not cancel the shared task.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[K, asyncio.Future[V]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def __len__(self) -> int:
+        """The number of keys currently in flight."""
+        return len(self._pending)
+
+    def __contains__(self, key: K) -> bool:
+        """Whether a call for key is in flight."""
+        return key in self._pending
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """Runs func for key, or joins the call for key that is already running.
+
+        Returns:
+            V: The result of the shared call. Exceptions raised by it are raised to every caller.
+        """
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func())
+            self._pending[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+        return await asyncio.shield(future)
+
+    async def do_many(self, keys: Iterable[K], func: Callable[[list[K]], Awaitable[Mapping[K, V]]]) -> dict[K, V]:
+        """Runs func once for the keys that are not in flight, and joins the calls for the others.
+
+        func receives the keys to compute and must return a result for each of them.
+
+        Returns:
+            dict[K, V]: The result for each key. Exceptions raised by func are raised to every caller of its keys.
+        """
+        keys = list(dict.fromkeys(keys))
+        # no await between finding the missing keys and registering them, so concurrent calls never overlap.
+        missing = [key for key in keys if key not in self._pending]
+        if missing:
+            loop = asyncio.get_running_loop()
+            futures: dict[K, asyncio.Future[V]] = {}
+            for key in missing:
+                future: asyncio.Future[V] = loop.create_future()
+                future.add_done_callback(partial(self._forget, key))
+                self._pending[key] = futures[key] = future
+            task = asyncio.ensure_future(self._fill(func, futures))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        shared = [self._pending[key] for key in keys]
+        results = await asyncio.gather(*(asyncio.shield(future) for future in shared))
+        return dict(zip(keys, results, strict=True))
+
+    async def _fill(
+        self, func: Callable[[list[K]], Awaitable[Mapping[K, V]]], futures: dict[K, asyncio.Future[V]]
+    ) -> None:
+        try:
+            results = await func(list(futures))
+            for key, future in futures.items():
+                future.set_result(results[key])
+        except Exception as e:  # noqa: BLE001 # raised to every caller
+            for future in futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # a cancelled fill must not leave its callers waiting.
+            for future in futures.values():
+                future.cancel()
+
+    def _forget(self, key: K, future: asyncio.Future[V]) -> None:
+        if self._pending.get(key) is future:
+            del self._pending[key]
+        if not future.cancelled():
+            # every caller may have been cancelled; retrieve the exception so asyncio does not log it.
+            future.exception()
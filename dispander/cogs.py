@@ -16,6 +16,9 @@ class ExpandDiscordMessageFromUrlCog(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.dispander = Dispander(bot)
 
+    async def cog_unload(self) -> None:  # noqa: D102 # because this method is cog hook
+        await self.dispander.close()
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:  # noqa: D102 # because this method is event listener
         if message.author.bot:
@@ -25,3 +28,23 @@ class ExpandDiscordMessageFromUrlCog(commands.Cog):
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent) -> None:  # noqa: D102 # because this method is event listener
         await self.dispander.delete_dispand(payload=payload)
+        await self.dispander.expand_preview(payload=payload)
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction) -> None:  # noqa: D102 # because this method is event listener
+        await self.dispander.delete_dispand_by_interaction(interaction=interaction)
+        await self.dispander.expand_preview_by_interaction(interaction=interaction)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:  # noqa: D102 # because this method is event listener
+        await self.dispander.invalidate_message(payload.channel_id, payload.message_id)
+        await self.dispander.redispand(payload=payload)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:  # noqa: D102 # because this method is event listener
+        await self.dispander.invalidate_message(payload.channel_id, payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent) -> None:  # noqa: D102 # because this method is event listener
+        for message_id in payload.message_ids:
+            await self.dispander.invalidate_message(payload.channel_id, message_id)
@@ -1,38 +1,80 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import re
-import sys
+from contextlib import aclosing, suppress
 from dataclasses import dataclass
+from datetime import timedelta
+from functools import partial
+from itertools import count
 from os import getenv
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal, TypedDict
 
-from discord import Client, Embed
-from discord.abc import Messageable
-from discord.errors import DiscordException
+from discord import ActionRow, Button as ButtonComponent, ButtonStyle, Client, Embed, InteractionType, Thread
+from discord.abc import GuildChannel, Messageable
+from discord.errors import Forbidden, HTTPException, NotFound
+from discord.ui import Button, View
+from discord.utils import escape_markdown, time_snowflake, utcnow
 
-__all__ = ('REGEX_DISCORD_MESSAGE_URL', 'Dispander')
+from .backends import MemoryCacheBackend
+from .cache import LRUCache, SingleFlight
+from .index import ExpansionIndex
+from .instrumentation import Instrumentation
+from .packing import fit_embed, pack_embeds
+from .scheduler import OutboundScheduler, WriteDroppedError
+
+__all__ = (
+    'DELETE_BUTTON_CUSTOM_ID',
+    'EXPAND_BUTTON_CUSTOM_ID',
+    'REGEX_DISCORD_MESSAGE_URL',
+    'AttachmentView',
+    'DeleteTrigger',
+    'Dispander',
+    'DispanderOptions',
+    'LinkedMessageView',
+    'MessageLookupStats',
+)
 
 if TYPE_CHECKING:
-    from discord import Colour, Emoji, Guild, Message, PartialEmoji, RawReactionActionEvent
+    from collections.abc import AsyncGenerator, Awaitable, Callable, Container, Coroutine, Hashable
+    from datetime import datetime
+    from typing import Any, Self, TypeVar
+
+    from discord import (
+        Colour,
+        Emoji,
+        Guild,
+        Interaction,
+        Message,
+        PartialEmoji,
+        PartialMessage,
+        RawMessageUpdateEvent,
+        RawReactionActionEvent,
+    )
+    from discord.types.message import Message as MessagePayload
+
+    from .backends import CacheBackend
+    from .policy import ExpansionPolicy
+    from .registry import SQLiteExpansionRegistry
+
+    T = TypeVar('T')
+
+    DeadLinkReason = Literal['forbidden', 'not_found']
+    RenderKey = tuple[int, None | datetime, Hashable]
+    Rendered = tuple['LinkedMessageView', tuple[Embed, ...]]
 
-if sys.version_info >= (3, 12):
-    from itertools import batched
-else:
-    from itertools import islice
 
-    if TYPE_CHECKING:
-        from collections.abc import Generator, Iterable
-        from typing import Any, TypeVar
+_log = logging.getLogger(__name__)
 
-        T = TypeVar('T')
+# the JSON error code of a NotFound response for a channel rather than a message.
+_UNKNOWN_CHANNEL = 10003
 
-    def batched(iterable: Iterable[T], n: int) -> Generator[tuple[T, ...], Any, None]:
-        if n < 1:
-            raise ValueError('n must be at least one')
-        iterator = iter(iterable)
-        while batch := islice(iterator, n):
-            yield tuple(batch)
+# the number of characters of each linked message shown in a lazy preview.
+_PREVIEW_CONTENT_LENGTH = 100
 
+# Discord shows up to this many consecutive embeds sharing a url as one gallery.
+_GALLERY_SIZE = 4
 
 REGEX_BASE_URL = (
     r'https://(ptb.|canary.)?discord(app)?.com/channels/'
@@ -45,6 +87,114 @@ REGEX_EXTRA_URL_LITERAL = (
 )
 REGEX_DISCORD_MESSAGE_URL = re.compile(r'(?!<)' + REGEX_BASE_URL + r'(?!>)')
 REGEX_EXTRA_URL = re.compile(REGEX_BASE_URL + REGEX_EXTRA_URL_LITERAL)
+DELETE_BUTTON_CUSTOM_ID = 'dispander:delete'
+EXPAND_BUTTON_CUSTOM_ID = 'dispander:expand'
+
+DeleteTrigger = Literal['reaction', 'button', 'none']
+
+
+class DispanderOptions(TypedDict, total=False):
+    """Keyword-only options accepted by Dispander and its subclasses."""
+
+    max_concurrent_fetches: None | int
+    max_concurrent_fetches_per_guild: None | int
+    message_cache_size: None | int
+    message_cache_ttl: None | float
+    message_cache: None | CacheBackend[MessagePayload]
+    collapse_duplicate_links: bool
+    expansion_index_size: None | int
+    single_send: bool
+    delete_trigger: DeleteTrigger
+    scheduler: None | OutboundScheduler
+    registry: None | SQLiteExpansionRegistry
+    instrumentation: None | Instrumentation
+    render_cache_size: None | int
+    negative_cache_size: None | int
+    negative_cache_ttl: None | float
+    policy: None | ExpansionPolicy
+    redispand_on_edit: bool
+    stream: bool
+    pack_expansions: bool
+    lazy: bool | Container[int]
+    expand_reaction_emoji: None | str | Emoji | PartialEmoji
+    max_images: None | int
+
+
+def _message_cache_key(channel_id: int, message_id: int) -> str:
+    return f'message:{channel_id}:{message_id}'
+
+
+# shared by every Dispander, so a version is never reused by another instance.
+_config_versions = count()
+
+
+@dataclass
+class MessageLookupStats:
+    """Counters for where linked messages were found.
+
+    ``coalesced`` counts lookups that joined a fetch already in flight for the same message.
+    ``negative_hits`` counts links skipped without a request because they recently failed with 403 or 404.
+    """
+
+    client_hits: int = 0
+    cache_hits: int = 0
+    fetches: int = 0
+    coalesced: int = 0
+    negative_hits: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class AttachmentView:
+    """The fields of an attachment that dispander renders."""
+
+    content_type: None | str
+    proxy_url: None | str
+
+
+@dataclass(frozen=True, slots=True)
+class LinkedMessageView:
+    """An immutable snapshot of the fields of a linked message that dispander renders.
+
+    It is built once per linked message, so rendering and customizing it never read or mutate the discord.py
+    models shared with the client's cache.
+    """
+
+    id: int
+    channel_id: int
+    author_id: int
+    author_name: str
+    author_icon_url: None | str
+    content: None | str
+    created_at: datetime
+    edited_at: None | datetime
+    jump_url: str
+    channel_name: None | str
+    guild_icon_url: None | str
+    attachments: tuple[AttachmentView, ...]
+    embeds: tuple[Embed, ...]
+
+    @classmethod
+    def from_message(cls, message: Message) -> Self:
+        """Copies the rendered fields of a message sent in a guild."""
+        assert message.guild is not None
+        icon = message.guild.icon
+        return cls(
+            id=message.id,
+            channel_id=message.channel.id,
+            author_id=message.author.id,
+            author_name=message.author.display_name,
+            author_icon_url=message.author.display_avatar.url,
+            content=message.content,
+            created_at=message.created_at,
+            edited_at=message.edited_at,
+            jump_url=message.jump_url,
+            channel_name=message.channel.name,  # type: ignore[reportUnknownMemberType,union-attr]
+            guild_icon_url=None if icon is None else icon.url,
+            attachments=tuple(
+                AttachmentView(attachment.content_type, attachment.proxy_url) for attachment in message.attachments
+            ),
+            embeds=tuple(message.embeds),
+        )
 
 
 @dataclass()
@@ -57,15 +207,90 @@ class FromJumpUrl:
 class Dispander:
     """A class to handle the expansion of Discord messages containing links to other messages."""
 
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         bot: Client,
         delete_reaction_emoji: None | str | Emoji | PartialEmoji = None,
         embed_color: None | int | Colour = None,
+        *,
+        max_concurrent_fetches: None | int = None,
+        max_concurrent_fetches_per_guild: None | int = None,
+        message_cache_size: None | int = None,
+        message_cache_ttl: None | float = None,
+        message_cache: None | CacheBackend[MessagePayload] = None,
+        collapse_duplicate_links: bool = False,
+        expansion_index_size: None | int = None,
+        single_send: bool = False,
+        delete_trigger: DeleteTrigger = 'reaction',
+        scheduler: None | OutboundScheduler = None,
+        registry: None | SQLiteExpansionRegistry = None,
+        instrumentation: None | Instrumentation = None,
+        render_cache_size: None | int = None,
+        negative_cache_size: None | int = None,
+        negative_cache_ttl: None | float = None,
+        policy: None | ExpansionPolicy = None,
+        redispand_on_edit: bool = False,
+        stream: bool = False,
+        pack_expansions: bool = False,
+        lazy: bool | Container[int] = False,
+        expand_reaction_emoji: None | str | Emoji | PartialEmoji = None,
+        max_images: None | int = None,
     ) -> None:
         self.bot = bot
         self.delete_reaction_emoji = delete_reaction_emoji  # type: ignore[assignment]
         self.embed_color = embed_color  # type: ignore[assignment]
+        self.max_images = max_images  # type: ignore[assignment]
+        self.max_concurrent_fetches = max_concurrent_fetches  # type: ignore[assignment]
+        self.max_concurrent_fetches_per_guild = max_concurrent_fetches_per_guild  # type: ignore[assignment]
+        self.__guild_fetch_semaphores: dict[int, asyncio.Semaphore] = {}
+        # message_cache_size and message_cache_ttl only configure the default in-memory backend.
+        if message_cache_size is None:
+            message_cache_size = int(getenv('DISPAND_MESSAGE_CACHE_SIZE', '256'))
+        if message_cache_ttl is None:
+            message_cache_ttl = float(getenv('DISPAND_MESSAGE_CACHE_TTL', '300'))
+        if message_cache is None:
+            message_cache = MemoryCacheBackend(message_cache_size, message_cache_ttl)
+        self.message_cache = message_cache
+        # channels missing from the guild cache, such as archived threads, resolved through REST.
+        self._fetched_channels: LRUCache[int, GuildChannel | Thread] = LRUCache(message_cache_size, message_cache_ttl)
+        self.message_lookup_stats = MessageLookupStats()
+        self._message_fetches: SingleFlight[tuple[int, int], Message] = SingleFlight()
+        self.collapse_duplicate_links = collapse_duplicate_links
+        if expansion_index_size is None:
+            expansion_index_size = int(getenv('DISPAND_EXPANSION_INDEX_SIZE', '10000'))
+        self.expansion_index = ExpansionIndex(expansion_index_size)
+        # single_send keeps the deletion data only in expansion_index and registry, so the first send is never edited.
+        self.single_send = single_send
+        self.delete_trigger: DeleteTrigger = delete_trigger
+        self.scheduler = scheduler
+        self.registry = registry
+        self.instrumentation = Instrumentation() if instrumentation is None else instrumentation
+        if render_cache_size is None:
+            render_cache_size = int(getenv('DISPAND_RENDER_CACHE_SIZE', '0'))
+        # (message id, edited_at, config version) -> the rendered view and embeds.
+        self.render_cache: LRUCache[RenderKey, Rendered] = LRUCache(render_cache_size)
+        if negative_cache_size is None:
+            negative_cache_size = int(getenv('DISPAND_NEGATIVE_CACHE_SIZE', '1024'))
+        if negative_cache_ttl is None:
+            negative_cache_ttl = float(getenv('DISPAND_NEGATIVE_CACHE_TTL', '600'))
+        # (channel id, message id) of links that failed with 403 or 404. A None message id covers the whole channel.
+        self.negative_cache: LRUCache[tuple[int, None | int], DeadLinkReason] = LRUCache(
+            negative_cache_size, negative_cache_ttl
+        )
+        self.policy = policy
+        self.redispand_on_edit = redispand_on_edit
+        # stream posts each expansion as soon as it is ready instead of after every link was resolved.
+        self.stream = stream
+        # pack_expansions lets the expansions of one dispand share messages, which are then deleted together.
+        self.pack_expansions = pack_expansions
+        # lazy posts a compact preview instead, everywhere or in the guilds and channels whose ids it contains.
+        self.lazy = lazy
+        if expand_reaction_emoji is None:
+            expand_reaction_emoji = getenv('EXPAND_REACTION_EMOJI', '\U0001f50e')
+        self.expand_reaction_emoji = expand_reaction_emoji
+        # preview message id -> (channel id, message id) of its source message.
+        self._previews: LRUCache[int, tuple[int, int]] = LRUCache(expansion_index_size)
+        self._expanding_previews: set[int] = set()
 
     @property
     def bot(self) -> Client:  # noqa: D102
@@ -96,50 +321,328 @@ class Dispander:
         if color is None:
             color = int(getenv('DEFAULT_EMBED_COLOR', '0'))
         self.__embed_color = color
+        self.__config_version = next(_config_versions)
+
+    @property
+    def max_images(self) -> int:
+        """The maximum number of image attachments shown per expansion. The rest are summarized by a link."""
+        return self.__max_images
+
+    @max_images.setter
+    def max_images(self, value: None | int) -> None:
+        if value is None:
+            value = int(getenv('DISPAND_MAX_IMAGES', '10'))
+        if value < 0:
+            raise ValueError('max_images must be zero or more')
+        self.__max_images = value
+        self.__config_version = next(_config_versions)
+
+    @property
+    def max_concurrent_fetches(self) -> int:
+        """The maximum number of linked messages fetched concurrently for one dispand."""
+        return self.__max_concurrent_fetches
+
+    @max_concurrent_fetches.setter
+    def max_concurrent_fetches(self, value: None | int) -> None:
+        if value is None:
+            value = int(getenv('DISPAND_MAX_CONCURRENT_FETCHES', '5'))
+        if value < 1:
+            raise ValueError('max_concurrent_fetches must be at least one')
+        self.__max_concurrent_fetches = value
+
+    @property
+    def max_concurrent_fetches_per_guild(self) -> int:
+        """The maximum number of linked messages fetched concurrently across all dispands in one guild."""
+        return self.__max_concurrent_fetches_per_guild
+
+    @max_concurrent_fetches_per_guild.setter
+    def max_concurrent_fetches_per_guild(self, value: None | int) -> None:
+        if value is None:
+            value = int(getenv('DISPAND_MAX_CONCURRENT_FETCHES_PER_GUILD', '10'))
+        if value < 1:
+            raise ValueError('max_concurrent_fetches_per_guild must be at least one')
+        self.__max_concurrent_fetches_per_guild = value
+        # drop semaphores sized for the previous limit; in-flight fetches keep their own reference.
+        self.__guild_fetch_semaphores = {}
 
     async def dispand(self, message: Message) -> None:
         """Expands the content of a message containing links to other messages."""
-        messages = await self._extract_message(message)
-        for msg in messages:
-            embeds: list[Embed] = []
+        await self._expand_links(message, self._allowed_links(message, self._scan_links(message)))
 
-            if msg.content or msg.attachments:
-                embeds.append(self._compose_embed(msg))
+    async def redispand(self, *, payload: RawMessageUpdateEvent) -> None:
+        """Updates the expansions of an edited message when redispand_on_edit is enabled.
 
-            for attachment in msg.attachments[1:]:
-                if not (attachment.content_type or '').startswith('image'):
-                    continue  # CUSTOMIZE: attachment.content_type
+        Only the links added by the edit are expanded, and the expansions of the links it removed are deleted.
+        An edit that keeps the links costs no API calls. When the message before the edit is not in the client's
+        cache and the expansion index cannot tell which links were expanded, e.g. after a restart, the edit is
+        ignored rather than expanding every link again.
+        """
+        message = payload.message
+        if not self.redispand_on_edit or message.guild is None or message.author.bot:
+            return
 
-                embeds.append(
-                    Embed(color=self.embed_color).set_image(url=attachment.proxy_url)
-                    # CUSTOMIZE: attachment.proxy_url
-                )
+        links = self._scan_links(message)
+        expansions = self.expansion_index.expansions_of(message.id)
+        if payload.cached_message is not None:
+            before = set(self._scan_links(payload.cached_message))
+        elif expansions or self.expansion_index.is_authoritative(message.id):
+            before = {target for targets in expansions.values() for target in targets}
+        else:
+            return
 
-            embeds.extend(msg.embeds)
+        current = set(links)
+        removed = [main_id for main_id, targets in expansions.items() if not current.issuperset(targets)]
+        await asyncio.gather(*(self._delete_indexed_expansion(message.channel.id, main_id) for main_id in removed))
+        # the kept links packed with a removed link lost their expansion along with it.
+        repacked = {target for main_id in removed for target in expansions[main_id] if target in current}
+        added = [
+            link
+            for link in links
+            # repacked links were already allowed by the policy when they were first expanded.
+            if link in repacked
+            or (link not in before and (self.policy is None or self._allowed_by_policy(message, link[1])))
+        ]
+        await self._expand_links(message, added)
 
-            if not embeds:
-                continue
+    async def _delete_indexed_expansion(self, channel_id: int, message_id: int) -> None:
+        data = self.expansion_index.get(message_id)
+        if data is not None:
+            await self._delete_expansion(channel_id, message_id, data)
 
-            sent_messages: list[Message] = [await message.channel.send(embeds=e) for e in batched(embeds, 10)]
+    async def iter_expansions(self, message: Message) -> AsyncGenerator[tuple[LinkedMessageView, list[Embed]], None]:
+        """Yields the view and embeds of each link of a message in link order, each as soon as it is ready.
 
-            main_message = sent_messages.pop(0)
-            main_embeds = main_message.embeds.copy()
-            await main_message.add_reaction(self.delete_reaction_emoji)
-            if main_embeds[0].author.name:
-                main_embeds[0].set_author(
-                    name=main_embeds[0].author.name,
-                    icon_url=main_embeds[0].author.icon_url,
-                    url=self._make_jump_url(message, msg, sent_messages),
-                )
-            else:
-                main_embeds.insert(
-                    0,
-                    Embed(color=self.embed_color).set_author(
-                        name='jump to origin message',
-                        url=self._make_jump_url(message, msg, sent_messages),
-                    ),
-                )
-            await main_message.edit(embeds=main_embeds)
+        Every link is fetched, customized and composed on its own, so the first expansion is yielded while later
+        links are still being fetched. Nothing is posted, and the policy is neither consulted nor charged, so a
+        later dispand of the same message is not debounced.
+        """
+        async with aclosing(self._iter_rendered(message, self._scan_links(message))) as rendered:
+            async for expansion in rendered:
+                yield expansion
+
+    async def _expand_links(self, message: Message, links: list[tuple[int, int]]) -> None:
+        if not links:
+            return
+        if self._is_lazy(message):
+            await self._preview(message, links)
+        else:
+            await self._dispand(message, links)
+
+    def _is_lazy(self, message: Message) -> bool:
+        if isinstance(self.lazy, bool):
+            return self.lazy
+        channel = message.channel
+        return (
+            channel.id in self.lazy
+            or (isinstance(channel, Thread) and channel.parent_id in self.lazy)
+            or (message.guild is not None and message.guild.id in self.lazy)
+        )
+
+    async def _dispand(self, message: Message, links: list[tuple[int, int]]) -> None:
+        if not self.stream:
+            rendered = await self._render(await self._extract_message(message, links))
+            for pack in pack_embeds([embeds for _, embeds in rendered], merge=self.pack_expansions):
+                views = [rendered[index][0] for index in pack.expansions]
+                await self._dispatch(message, views, pack.messages)
+            return
+        async with aclosing(self._iter_rendered(message, links)) as rendered_links:
+            async for msg, embeds in rendered_links:
+                for pack in pack_embeds([embeds]):
+                    await self._dispatch(message, [msg], pack.messages)
+
+    async def _iter_rendered(
+        self,
+        message: Message,
+        links: list[tuple[int, int]],
+    ) -> AsyncGenerator[tuple[LinkedMessageView, list[Embed]], None]:
+        async def render(fetch: Awaitable[None | Message]) -> list[tuple[LinkedMessageView, list[Embed]]]:
+            linked = await fetch
+            return [] if linked is None else await self._render([linked])
+
+        tasks = [asyncio.ensure_future(render(fetch)) for fetch in self._fetch_links(message, links)]
+        try:
+            # awaiting in link order keeps the output order while every link is processed concurrently.
+            for task in tasks:
+                for rendered in await task:
+                    yield rendered
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _dispatch(
+        self,
+        message: Message,
+        views: list[LinkedMessageView],
+        batches: tuple[tuple[Embed, ...], ...],
+    ) -> None:
+        self.instrumentation.count('expansions', len(views))
+        self.instrumentation.count('embeds', sum(len(batch) for batch in batches))
+
+        if self.scheduler is None:
+            await self._post_expansion(message, views, batches)
+            return
+        with suppress(WriteDroppedError):  # shed by the scheduler's overflow policy
+            await self.scheduler.run(message.channel.id, partial(self._post_expansion, message, views, batches))
+
+    async def close(self) -> None:
+        """Waits for pending writes to finish. Call this before the bot shuts down."""
+        if self.scheduler is not None:
+            await self.scheduler.close()
+        if self.registry is not None:
+            await self.registry.close()
+
+    async def _render(self, messages: list[Message]) -> list[tuple[LinkedMessageView, list[Embed]]]:
+        """Returns the view and embeds of each linked message, reusing cached renders when enabled."""
+        version = self._render_config_version()
+        keys = [(message.id, message.edited_at, version) for message in messages]
+        cached = [self.render_cache.get(key) if self.render_cache.maxsize else None for key in keys]
+        misses = [message for message, hit in zip(messages, cached, strict=True) if hit is None]
+        if len(misses) < len(messages):
+            self.instrumentation.count('cache_hits', len(messages) - len(misses), source='render')
+
+        views = iter(await self._make_views(misses)) if misses else iter(())
+        # a config change while making the views changes the version; do not cache those renders.
+        cacheable = self.render_cache.maxsize > 0 and self._render_config_version() == version
+        rendered: list[tuple[LinkedMessageView, list[Embed]]] = []
+        for key, hit in zip(keys, cached, strict=True):
+            entry = hit
+            if entry is None:
+                view, complete = next(views)
+                with self.instrumentation.span('compose'):
+                    entry = (view, tuple(self._build_embeds(view)))
+                if cacheable and complete:
+                    self.render_cache.set(key, entry)
+            rendered.append((entry[0], list(entry[1])))
+        return rendered
+
+    def _render_config_version(self) -> Hashable:
+        """A value that changes whenever the configuration that affects rendering changes."""
+        return self.__config_version
+
+    async def _make_views(self, messages: list[Message]) -> list[tuple[LinkedMessageView, bool]]:
+        """Builds the view rendered for each linked message, and whether it is complete enough to be cached."""
+        return [(LinkedMessageView.from_message(message), True) for message in messages]
+
+    def _build_embeds(self, msg: LinkedMessageView) -> list[Embed]:
+        embeds: list[Embed] = []
+
+        if msg.content or msg.attachments:
+            embeds.append(self._compose_embed(msg))
+            embeds.extend(self._build_gallery(msg, embeds[0]))
+
+        embeds.extend(msg.embeds)
+
+        if embeds and not embeds[0].author.name:
+            embeds.insert(
+                0,
+                Embed(color=self.embed_color).set_author(name='jump to origin message', url=msg.jump_url),
+            )
+        return embeds
+
+    async def _post_expansion(
+        self,
+        message: Message,
+        views: list[LinkedMessageView],
+        batches: tuple[tuple[Embed, ...], ...],
+    ) -> None:
+        """Posts the messages of one pack of expansions and records them as one expansion to delete."""
+        channel = message.channel
+        view = self._make_view()
+        sent_messages: list[Message] = [
+            await self._call('send', partial(channel.send, embeds=batches[0], view=view))
+            if view is not None
+            else await self._call('send', partial(channel.send, embeds=batches[0]))
+        ]
+        sent_messages.extend([await self._call('send', partial(channel.send, embeds=e)) for e in batches[1:]])
+
+        main_message = sent_messages.pop(0)
+        data = self._make_deletion_data(message, views, [m.id for m in sent_messages])
+        await self._register_expansion(message, main_message, views, data)
+        if self.single_send:
+            return
+
+        main_embeds = main_message.embeds.copy()
+        main_embeds[0].set_author(
+            name=main_embeds[0].author.name,
+            icon_url=main_embeds[0].author.icon_url,
+            url=self._make_jump_url(views[0].jump_url, data),
+        )
+        await self._call('edit', partial(main_message.edit, embeds=main_embeds))
+
+    def _make_deletion_data(
+        self,
+        message: Message,
+        views: list[LinkedMessageView],
+        extra_messages: list[int],
+    ) -> FromJumpUrl:
+        base_author_ids = {msg.author_id for msg in views}
+        return FromJumpUrl(
+            # a message quoting several authors can only be deleted by the author of the source message.
+            base_author_id=base_author_ids.pop() if len(base_author_ids) == 1 else message.author.id,
+            author_id=message.author.id,
+            extra_messages=extra_messages,
+        )
+
+    async def _register_expansion(
+        self,
+        message: Message,
+        main_message: Message,
+        views: list[LinkedMessageView],
+        data: FromJumpUrl,
+    ) -> None:
+        self.expansion_index.add(main_message.id, data, message.id, tuple((msg.channel_id, msg.id) for msg in views))
+        if self.registry is not None:
+            self.registry.add(main_message.id, message.channel.id, message.id, data)
+        if self.delete_trigger == 'reaction':
+            await self._call('reaction', partial(main_message.add_reaction, self.delete_reaction_emoji))
+
+    async def _preview(self, message: Message, links: list[tuple[int, int]]) -> None:
+        linked = await self._extract_message(message, links)
+        if not linked:
+            return
+        views = [view for view, _ in await self._make_views(linked)]
+        self.instrumentation.count('previews')
+
+        if self.scheduler is None:
+            await self._post_preview(message, views)
+            return
+        with suppress(WriteDroppedError):  # shed by the scheduler's overflow policy
+            await self.scheduler.run(message.channel.id, partial(self._post_preview, message, views))
+
+    async def _post_preview(self, message: Message, views: list[LinkedMessageView]) -> None:
+        """Posts one compact preview of every linked message, to be replaced by the full expansions on request."""
+        data = self._make_deletion_data(message, views, [])
+        # a preview is never split, so its jump url is known before sending and it needs no edit.
+        embed = self._compose_preview(views).set_author(
+            name='linked messages', url=self._make_jump_url(message.jump_url, data)
+        )
+        view = self._make_view(preview=True)
+        preview = await self._call('send', partial(message.channel.send, embed=fit_embed(embed), view=view))
+        self._previews.set(preview.id, (message.channel.id, message.id))
+        await self._register_expansion(message, preview, views, data)
+
+    async def _call(self, stage: str, func: Callable[[], Awaitable[T]]) -> T:
+        self.instrumentation.count('api_calls', call=stage)
+        with self.instrumentation.span(stage):
+            if self.scheduler is None:
+                return await func()
+            return await self.scheduler.retry(func)
+
+    def _make_view(self, *, preview: bool = False) -> None | View:
+        if self.delete_trigger != 'button' and not preview:
+            return None
+        view = View(timeout=None)
+        if preview:
+            view.add_item(
+                Button(emoji=self.expand_reaction_emoji, style=ButtonStyle.primary, custom_id=EXPAND_BUTTON_CUSTOM_ID)
+            )
+        if self.delete_trigger == 'button':
+            view.add_item(
+                Button(emoji=self.delete_reaction_emoji, style=ButtonStyle.secondary, custom_id=DELETE_BUTTON_CUSTOM_ID)
+            )
+        # clicks are handled by the *_by_interaction methods; a stopped view is sent without being stored per message.
+        view.stop()
+        return view
 
     async def delete_dispand(self, *, payload: RawReactionActionEvent) -> None:
         """Deletes the expanded messages when the delete reaction emoji is used."""
@@ -150,60 +653,330 @@ class Dispander:
         if payload.user_id == self.bot.user.id:
             return
 
+        data = self.expansion_index.get(payload.message_id)
+        if data is None:
+            if self.expansion_index.is_authoritative(payload.message_id):
+                return
+            data = await self._get_registered_expansion(payload.message_id)
+        if data is None:
+            await self._delete_dispand_from_message(payload=payload)
+            return
+
+        if payload.user_id not in (data.base_author_id, data.author_id):
+            return
+
+        await self._delete_expansion(payload.channel_id, payload.message_id, data)
+
+    async def delete_dispand_by_interaction(self, *, interaction: Interaction) -> None:
+        """Deletes the expanded messages when the delete button of an expansion is pressed."""
+        if interaction.type is not InteractionType.component or interaction.message is None:
+            return
+        if interaction.data is None or interaction.data.get('custom_id') != DELETE_BUTTON_CUSTOM_ID:
+            return
+
+        message = interaction.message
+        data = self.expansion_index.get(message.id) or await self._get_registered_expansion(message.id)
+        # the interaction carries the message, so no fetch is needed to read the jump url.
+        url = message.embeds[0].author.url if message.embeds else None
+        if data is None and url is not None and REGEX_EXTRA_URL.match(url) is not None:
+            data = self._from_jump_url(url)
+        if data is None or interaction.user.id not in (data.base_author_id, data.author_id):
+            await interaction.response.send_message('You cannot delete this message.', ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        await self._delete_expansion(message.channel.id, message.id, data)
+
+    async def expand_preview(self, *, payload: RawReactionActionEvent) -> None:
+        """Replaces a lazy preview with the full expansions when the expand reaction emoji is used."""
+        if self.lazy is False or str(payload.emoji) != str(self.expand_reaction_emoji) or payload.guild_id is None:
+            return
+
+        assert self.bot.user is not None
+        if payload.user_id == self.bot.user.id:
+            return
+
+        source = self._previews.get(payload.message_id)
+        if source is None:
+            # an indexed message that is not a known preview is a regular expansion.
+            if self.expansion_index.get(payload.message_id) is not None or self.expansion_index.is_authoritative(
+                payload.message_id
+            ):
+                return
+            channel = self.bot.get_partial_messageable(payload.channel_id)
+            try:
+                message = await self._call('fetch', partial(channel.fetch_message, payload.message_id))
+            except NotFound:
+                return
+            source = self._preview_source(message)
+        if source is None:
+            return
+
+        await self._expand_preview(payload.guild_id, payload.channel_id, payload.message_id, source)
+
+    async def expand_preview_by_interaction(self, *, interaction: Interaction) -> None:
+        """Replaces a lazy preview with the full expansions when its expand button is pressed."""
+        if interaction.type is not InteractionType.component or interaction.message is None:
+            return
+        if interaction.data is None or interaction.data.get('custom_id') != EXPAND_BUTTON_CUSTOM_ID:
+            return
+
+        message = interaction.message
+        source = self._previews.get(message.id) or self._preview_source(message)
+        if source is None or interaction.guild_id is None:
+            await interaction.response.send_message('This preview cannot be expanded.', ephemeral=True)
+            return
+
+        await interaction.response.defer()
+        await self._expand_preview(interaction.guild_id, message.channel.id, message.id, source)
+
+    def _preview_source(self, message: Message) -> None | tuple[int, int]:
+        """Returns the channel id and message id of the source of a preview, read from the preview itself."""
+        assert self.bot.user is not None
+        if message.author.id != self.bot.user.id or not message.embeds or message.embeds[0].author.url is None:
+            return None
+        if not any(
+            isinstance(child, ButtonComponent) and child.custom_id == EXPAND_BUTTON_CUSTOM_ID
+            for row in message.components
+            if isinstance(row, ActionRow)
+            for child in row.children
+        ):
+            return None
+        match = REGEX_EXTRA_URL.match(message.embeds[0].author.url)
+        return None if match is None else (int(match['channel']), int(match['message']))
+
+    async def _expand_preview(self, guild_id: int, channel_id: int, message_id: int, source: tuple[int, int]) -> None:
+        guild = self.bot.get_guild(guild_id)
+        # a preview pressed twice, or reacted to while being expanded, is expanded once.
+        if guild is None or message_id in self._expanding_previews:
+            return
+        self._expanding_previews.add(message_id)
+        try:
+            try:
+                message = await self._fetch_message_from_id(guild, *source)
+            except HTTPException:
+                return  # the source message is gone or can no longer be read.
+            self._previews.pop(message_id)
+            # the links were already allowed by the policy when the preview was posted.
+            await self._dispand(message, self._scan_links(message))
+            data = self.expansion_index.get(message_id) or self._make_deletion_data(message, [], [])
+            await self._delete_expansion(channel_id, message_id, data)
+        finally:
+            self._expanding_previews.discard(message_id)
+
+    async def _get_registered_expansion(self, message_id: int) -> None | FromJumpUrl:
+        if self.registry is None:
+            return None
+        registered = await self.registry.get(message_id)
+        return None if registered is None else registered[1]
+
+    async def _delete_dispand_from_message(self, *, payload: RawReactionActionEvent) -> None:
+        assert self.bot.user is not None
         channel = self.bot.get_channel(payload.channel_id)
         if channel is None:
-            channel = await self.bot.fetch_channel(payload.channel_id)
+            channel = await self._call('fetch_channel', partial(self.bot.fetch_channel, payload.channel_id))
         assert isinstance(channel, Messageable)
 
-        message = await channel.fetch_message(payload.message_id)
+        message = await self._call('fetch', partial(channel.fetch_message, payload.message_id))
         if message.author.id != self.bot.user.id or not message.embeds:
             return
 
         embed = message.embeds[0]
-        if embed.author.url is None:
+        # single_send expansions keep the plain jump url, so only the index or the registry can delete them.
+        if embed.author.url is None or REGEX_EXTRA_URL.match(embed.author.url) is None:
             return
 
         data = self._from_jump_url(embed.author.url)
         if payload.user_id not in (data.base_author_id, data.author_id):
             return
 
-        await message.delete()
-        for message_id in data.extra_messages:
+        await self._delete_expansion(message.channel.id, message.id, data)
+
+    async def _delete_expansion(self, channel_id: int, message_id: int, data: FromJumpUrl) -> None:
+        self.expansion_index.remove(message_id)
+        self._previews.pop(message_id)
+        if self.registry is not None:
+            self.registry.remove(message_id)
+        message_ids = [message_id, *data.extra_messages]
+        if 1 < len(message_ids) <= 100 and self._can_bulk_delete(channel_id, message_ids):
             try:
-                extra_message = await message.channel.fetch_message(message_id)
-            except DiscordException:
-                pass
+                await self._call(
+                    'delete', partial(self.bot.http.delete_messages, channel_id, [str(id_) for id_ in message_ids])
+                )
+            except HTTPException:
+                pass  # e.g. some messages are already gone; fall back to deleting them one by one.
             else:
-                await extra_message.delete()
+                return
 
-    async def _extract_message(self, message: Message) -> list[Message]:
-        messages: list[Message] = []
+        channel = self.bot.get_partial_messageable(channel_id)
+        await asyncio.gather(*(self._delete_message(channel.get_partial_message(id_)) for id_ in message_ids))
+
+    async def _delete_message(self, message: PartialMessage) -> None:
+        with suppress(NotFound):
+            await self._call('delete', message.delete)
+
+    def _can_bulk_delete(self, channel_id: int, message_ids: list[int]) -> bool:
+        channel = self.bot.get_channel(channel_id)
+        if not isinstance(channel, GuildChannel) or not channel.permissions_for(channel.guild.me).manage_messages:
+            return False
+        # the bulk delete endpoint rejects messages older than two weeks; keep a minute of margin.
+        oldest_allowed = time_snowflake(utcnow() - timedelta(days=14, minutes=-1))
+        return min(message_ids) > oldest_allowed
+
+    def _scan_links(self, message: Message) -> list[tuple[int, int]]:
+        """Returns the channel id and message id of each link to a message of the same guild, in order."""
         assert message.guild is not None
-        for ids in REGEX_DISCORD_MESSAGE_URL.finditer(message.content):
-            if message.guild.id != int(ids['guild']):
-                continue
-            messages.append(
-                await self._fetch_message_from_id(
-                    guild=message.guild,
-                    channel_id=int(ids['channel']),
-                    message_id=int(ids['message']),
-                )
-            )
+        guild_id = message.guild.id
+        with self.instrumentation.span('scan'):
+            ids = [
+                (int(match['channel']), int(match['message']))
+                for match in REGEX_DISCORD_MESSAGE_URL.finditer(message.content)
+                if guild_id == int(match['guild'])
+            ]
+        if self.collapse_duplicate_links:
+            ids = list(dict.fromkeys(ids))
+        return ids
+
+    async def _extract_message(self, message: Message, ids: None | list[tuple[int, int]] = None) -> list[Message]:
+        # gather keeps the link order, and return_exceptions lets the other fetches finish when one fails.
+        results = await asyncio.gather(*self._fetch_links(message, ids), return_exceptions=True)
+        messages: list[Message] = []
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            if result is not None:
+                messages.append(result)
         return messages
 
+    def _fetch_links(
+        self,
+        message: Message,
+        ids: None | list[tuple[int, int]] = None,
+    ) -> list[Coroutine[Any, Any, None | Message]]:
+        """Returns one coroutine per link, resolving to the linked message or None."""
+        assert message.guild is not None
+        guild = message.guild
+        if ids is None:
+            ids = self._scan_links(message)
+        if not ids:
+            return []
+
+        dispand_semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        guild_semaphore = self._get_guild_fetch_semaphore(guild.id)
+
+        async def fetch(channel_id: int, message_id: int) -> None | Message:
+            if self._is_dead_link(channel_id, message_id):
+                return None
+            async with dispand_semaphore, guild_semaphore:
+                try:
+                    return await self._fetch_message_from_id(guild=guild, channel_id=channel_id, message_id=message_id)
+                except HTTPException as e:
+                    # one inaccessible link must not prevent the others from being expanded.
+                    _log.debug('skipping the link to %d/%d after HTTP %d', channel_id, message_id, e.status)
+                    self.instrumentation.count('skipped_links', status=str(e.status))
+                    return None
+
+        return [fetch(*id_) for id_ in ids]
+
+    def _allowed_links(self, message: Message, links: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """Returns the links the policy allows to expand. Suppressed links are never fetched."""
+        if self.policy is None:
+            return links
+        return [link for link in links if self._allowed_by_policy(message, link[1])]
+
+    def _allowed_by_policy(self, message: Message, message_id: int) -> bool:
+        assert self.policy is not None
+        if self.policy.allow(message.channel.id, message.author.id, message_id):
+            return True
+        self.instrumentation.count('suppressed_links')
+        return False
+
+    def _is_dead_link(self, channel_id: int, message_id: int) -> bool:
+        if (channel_id, None) not in self.negative_cache and (channel_id, message_id) not in self.negative_cache:
+            return False
+        self.message_lookup_stats.negative_hits += 1
+        self.instrumentation.count('cache_hits', source='negative')
+        return True
+
+    def _remember_dead_link(self, channel_id: int, message_id: None | int, error: HTTPException) -> None:
+        if isinstance(error, Forbidden):
+            # missing permissions apply to every message of the channel.
+            self.negative_cache.set((channel_id, None), 'forbidden')
+        elif isinstance(error, NotFound):
+            if error.code == _UNKNOWN_CHANNEL:
+                message_id = None
+            self.negative_cache.set((channel_id, message_id), 'not_found')
+
+    def _get_guild_fetch_semaphore(self, guild_id: int) -> asyncio.Semaphore:
+        semaphore = self.__guild_fetch_semaphores.get(guild_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_fetches_per_guild)
+            self.__guild_fetch_semaphores[guild_id] = semaphore
+        return semaphore
+
+    async def invalidate_message(self, channel_id: int, message_id: int) -> None:
+        """Drops a linked message from the message cache, e.g. after it was edited or deleted.
+
+        A lazy preview is also forgotten; if it still exists, it is recognised from its button when pressed.
+        """
+        self._previews.pop(message_id)
+        await self.message_cache.delete(_message_cache_key(channel_id, message_id))
+
+    def _get_client_message(self, channel_id: int, message_id: int) -> None | Message:
+        message = self.bot._connection._get_message(message_id)
+        if message is not None and message.channel.id == channel_id:
+            self.message_lookup_stats.client_hits += 1
+            self.instrumentation.count('cache_hits', source='client')
+            return message
+        return None
+
     async def _fetch_message_from_id(self, guild: Guild, channel_id: int, message_id: int) -> Message:
-        ch = guild.get_channel_or_thread(channel_id)
-        if ch is None:
-            ch = await guild.fetch_channel(channel_id)
+        message = self._get_client_message(channel_id, message_id)
+        if message is not None:
+            return message
+
+        key = (channel_id, message_id)
+        if key in self._message_fetches:
+            self.message_lookup_stats.coalesced += 1
+        return await self._message_fetches.do(key, partial(self._load_message, guild, channel_id, message_id))
+
+    async def _load_message(self, guild: Guild, channel_id: int, message_id: int) -> Message:
+        # the cache holds raw payloads, so it can be shared between processes and every hit builds a new Message.
+        cache_key = _message_cache_key(channel_id, message_id)
+        data = await self.message_cache.get(cache_key)
+
+        with self.instrumentation.span('resolve_channel'):
+            # a channel fetched once is reused, so a cached message never waits for REST.
+            ch = guild.get_channel_or_thread(channel_id) or self._fetched_channels.get(channel_id)
+            if ch is None:
+                try:
+                    ch = await self._call('fetch_channel', partial(guild.fetch_channel, channel_id))
+                except HTTPException as e:
+                    self._remember_dead_link(channel_id, None, e)
+                    raise
+                self._fetched_channels.set(channel_id, ch)
         assert isinstance(ch, Messageable)
-        return await ch.fetch_message(message_id)
 
-    def _make_jump_url(self, base_message: Message, dispand_message: Message, extra_messages: list[Message]) -> str:
+        if data is not None:
+            self.message_lookup_stats.cache_hits += 1
+            self.instrumentation.count('cache_hits', source='local')
+            return self.bot._connection.create_message(channel=ch, data=data)
+
+        try:
+            fetched = await self._call('fetch', partial(self.bot.http.get_message, channel_id, message_id))
+        except HTTPException as e:
+            self._remember_dead_link(channel_id, message_id, e)
+            raise
+        self.message_lookup_stats.fetches += 1
+        await self.message_cache.set(cache_key, fetched)
+        return self.bot._connection.create_message(channel=ch, data=fetched)
+
+    def _make_jump_url(self, jump_url: str, data: FromJumpUrl) -> str:
         return (
-            f'{dispand_message.jump_url}'
-            f'?base_aid={dispand_message.author.id}'
-            f'&aid={base_message.author.id}'
-            f'&extra={",".join(str(msg.id) for msg in extra_messages)}'
+            f'{jump_url}'
+            f'?base_aid={data.base_author_id}'
+            f'&aid={data.author_id}'
+            f'&extra={",".join(str(id_) for id_ in data.extra_messages)}'
         )
 
     def _from_jump_url(self, url: str) -> FromJumpUrl:
@@ -216,31 +989,63 @@ class Dispander:
             extra_messages=([int(_id) for _id in data['extra_messages'].split(',')] if data['extra_messages'] else []),
         )
 
-    def _compose_embed(self, message: Message) -> Embed:
-        assert message.guild is not None
-        icon_url = message.guild.icon.url if message.guild.icon else None  # CUSTOMIZE: message.guild.icon
+    def _build_gallery(self, msg: LinkedMessageView, main: Embed) -> list[Embed]:
+        """Returns the embeds of the image attachments after the first, grouped with main into galleries."""
+        images = [
+            attachment.proxy_url
+            for attachment in msg.attachments[1:]
+            if attachment.proxy_url and (attachment.content_type or '').startswith('image')
+        ]
+        shown, hidden = self.max_images, 0
+        if main.image.url is not None:
+            if shown == 0:
+                main.set_image(url=None)
+                hidden = 1
+            else:
+                shown -= 1
+
+        embeds = [Embed(color=self.embed_color).set_image(url=url) for url in images[:shown]]
+        hidden += len(images) - len(embeds)
+        if hidden:
+            summary = f'[and {hidden} more images]({msg.jump_url})'
+            main.description = f'{main.description}\n{summary}' if main.description else summary
+        if embeds:
+            for i, embed in enumerate([main, *embeds]):
+                embed.url = f'{msg.jump_url}?gallery={i // _GALLERY_SIZE}'
+        return embeds
+
+    def _compose_preview(self, messages: list[LinkedMessageView]) -> Embed:
+        lines: list[str] = []
+        for message in messages:
+            content = ' '.join((message.content or '').split())
+            if len(content) > _PREVIEW_CONTENT_LENGTH:
+                content = content[: _PREVIEW_CONTENT_LENGTH - 1].rstrip() + '…'
+            if not content and message.attachments:
+                content = f'({len(message.attachments)} attachments)'
+            lines.append(f'**{escape_markdown(message.author_name)}** {content}\n{message.jump_url}')
+        return Embed(description='\n'.join(lines), color=self.embed_color)
+
+    def _compose_embed(self, message: LinkedMessageView) -> Embed:
         embed = (
             Embed(
-                description=message.content,  # CUSTOMIZE: message.content
+                description=message.content,
                 timestamp=message.created_at,
                 color=self.embed_color,
             )
             .set_author(
-                name=message.author.display_name,  # CUSTOMIZE: message.author.display_name
-                icon_url=message.author.display_avatar.url,  # CUSTOMIZE: message.author.display_avatar.url
+                name=message.author_name,
+                icon_url=message.author_icon_url,
                 url=message.jump_url,  # replace after send
             )
             .set_footer(
-                text=message.channel.name,  # type: ignore[reportUnknownMemberType,union-attr] # CUSTOMIZE: message.channel.name
-                icon_url=icon_url,
+                text=message.channel_name,
+                icon_url=message.guild_icon_url,
             )
         )
         if (
             message.attachments
             and (attachment := message.attachments[0]).proxy_url
-            # CUSTOMIZE: attachment.content_type
             and (attachment.content_type or '').startswith('image')
         ):
-            # CUSTOMIZE: attachment.proxy_url
             embed.set_image(url=attachment.proxy_url)
         return embed
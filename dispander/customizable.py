@@ -1,31 +1,43 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import TYPE_CHECKING, NamedTuple, TypeAlias
+import asyncio
+from dataclasses import dataclass, replace
+from functools import partial
+from itertools import count, islice
+from typing import TYPE_CHECKING, Generic, TypeAlias, TypeVar
 
 from discord import DMChannel, GroupChannel, PartialMessageable
 from discord.utils import maybe_coroutine
 
-from .core import Dispander
+from .backends import MemoryCacheBackend
+from .cache import SingleFlight
+from .core import AttachmentView, Dispander, LinkedMessageView
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import Awaitable, Callable, Hashable as HashableKey, Iterable, Mapping
     from types import EllipsisType
-    from typing import Any, Concatenate, ParamSpec, Self, TypeVar
+    from typing import Self, Unpack
 
-    from discord import Asset, Attachment, Client, Colour, Emoji, Guild, Member, Message, PartialEmoji, User
+    from discord import Attachment, Client, Colour, Emoji, Guild, Message, PartialEmoji
     from discord.abc import MessageableChannel
     from discord.mixins import Hashable
 
-    P = ParamSpec('P')
-    Id = TypeVar('Id', bound=Hashable)
+    from .backends import CacheBackend
+    from .cache import CacheStats
+    from .core import DispanderOptions
+
     T = TypeVar('T')
     U = TypeVar('U')
     Optional_: TypeAlias = EllipsisType | None | T
 
+_Id = TypeVar('_Id', bound='Hashable')
+_T = TypeVar('_T')
+
 
 __all__ = (
     'AttachmentCustomized',
+    'BatchCustomizer',
+    'CachedCustomizer',
     'ChannelCustomized',
     'CustomizableDispander',
     'Customizer',
@@ -72,70 +84,158 @@ if TYPE_CHECKING:
     MessageCustomizerFunc = MaybeCoroutineFunc[Message, MessageCustomized]
     AttachmentCustomizerFunc = MaybeCoroutineFunc[Attachment, AttachmentCustomized]
 
+    BatchFunc = MaybeCoroutineFunc[list[T], Mapping[int, U]]
+    GuildBatchCustomizerFunc = BatchFunc[Guild, GuildCustomized]
+    ChannelBatchCustomizerFunc = BatchFunc[MessageableChannel, ChannelCustomized]
+    MessageBatchCustomizerFunc = BatchFunc[Message, MessageCustomized]
+    AttachmentBatchCustomizerFunc = BatchFunc[Attachment, AttachmentCustomized]
 
-class IconMock(NamedTuple):
-    url: str | None
 
+def _customized(value: EllipsisType | _T, original: _T) -> _T:
+    return original if value is ... else value
 
-class UserMock(NamedTuple):
-    user: User | Member
-    avatar: Asset | IconMock | None
-    display_avatar: Asset | IconMock | None
-    display_name: str
 
-    def __getattribute__(self, name: str) -> Any:  # noqa: ANN401
-        try:
-            return object.__getattribute__(self, name)
-        except AttributeError:
-            return object.__getattribute__(self.user, name)
+class CachedCustomizer(Generic[_Id, _T]):
+    """A customizer function wrapped with a cache keyed by the id of its argument.
 
+    Concurrent calls for the same id share one call of the wrapped function.
 
-class GuildMock(NamedTuple):
-    guild: Guild
-    icon: IconMock | None
+    Args:
+        func (Callable[[Id], Awaitable[T] | T]): The customizer function to cache.
+        maxsize (int, optional): The maximum number of cached results of the default backend. Defaults to 1024.
+        ttl (float | None, optional): Seconds a result stays cached in the default backend. None means no expiry.
+            Defaults to None.
+        version (Callable[[Id], Hashable] | None, optional): Returns a value that changes when the argument
+            changes, e.g. ``Message.edited_at``. A result is only reused for the same version. Defaults to None.
+        namespace (str, optional): The prefix of the cache keys, so several customizers can share a backend.
+            Defaults to ``'customizer'``.
+        backend (CacheBackend[T] | None, optional): Where results are stored. Defaults to a
+            :class:`~dispander.backends.MemoryCacheBackend` of maxsize and ttl.
+    """
 
-    def __getattribute__(self, name: str) -> Any:  # noqa: ANN401
-        try:
-            return object.__getattribute__(self, name)
-        except AttributeError:
-            return object.__getattribute__(self.guild, name)
+    def __init__(  # noqa: PLR0913
+        self,
+        func: Callable[[_Id], Awaitable[_T] | _T],
+        *,
+        maxsize: int = 1024,
+        ttl: None | float = None,
+        version: None | Callable[[_Id], HashableKey] = None,
+        namespace: str = 'customizer',
+        backend: None | CacheBackend[_T] = None,
+    ) -> None:
+        self.func = func
+        self.version = version
+        self.namespace = namespace
+        self.cache: CacheBackend[_T] = MemoryCacheBackend(maxsize, ttl) if backend is None else backend
+        self._in_flight: SingleFlight[str, _T] = SingleFlight()
+
+    async def __call__(self, value: _Id) -> _T:
+        """Returns the cached result for value, calling the wrapped function on a miss."""
+        version = None if self.version is None else self.version(value)
+        key = f'{self.namespace}:{value.id}:{version}'
+        if key not in self._in_flight and (cached := await self.cache.get(key)) is not None:
+            return cached
+
+        async def call() -> _T:
+            returned = await maybe_coroutine(self.func, value)
+            await self.cache.set(key, returned)
+            return returned
+
+        return await self._in_flight.do(key, call)
+
+
+def cache(  # noqa: PLR0913
+    func: Callable[[_Id], Awaitable[_T] | _T],
+    *,
+    maxsize: int = 1024,
+    ttl: None | float = None,
+    version: None | Callable[[_Id], HashableKey] = None,
+    namespace: str = 'customizer',
+    backend: None | CacheBackend[_T] = None,
+) -> CachedCustomizer[_Id, _T]:
+    """Wraps a customizer function with a :class:`CachedCustomizer`."""
+    return CachedCustomizer(func, maxsize=maxsize, ttl=ttl, version=version, namespace=namespace, backend=backend)
+
+
+class BatchCustomizer(Generic[_Id, _T]):
+    """A customizer function that customizes every object of one dispand in a single call.
+
+    The function receives the objects as a list and returns a mapping of their ids to results.
+    Objects whose ids are missing from the mapping are left uncustomized.
+    With a cache, only the objects without a cached result are passed, and concurrent calls for the same id
+    share one call of the function.
+
+    Args:
+        func (Callable[[list[Id]], Awaitable[Mapping[int, T]] | Mapping[int, T]]): The batch customizer function.
+        default (Callable[[], T]): Returns the uncustomized result, e.g. ``MessageCustomized``.
+        version (Callable[[Id], Hashable] | None, optional): Returns a value that changes when the argument
+            changes, e.g. ``Message.edited_at``. A result is only reused for the same version. Defaults to None.
+        namespace (str, optional): The prefix of the cache keys, so several customizers can share a backend.
+            Defaults to ``'customizer'``.
+        backend (CacheBackend[T] | None, optional): Where results are stored. None disables the cache.
+            Defaults to None.
+    """
 
+    def __init__(
+        self,
+        func: Callable[[list[_Id]], Awaitable[Mapping[int, _T]] | Mapping[int, _T]],
+        default: Callable[[], _T],
+        *,
+        version: None | Callable[[_Id], HashableKey] = None,
+        namespace: str = 'customizer',
+        backend: None | CacheBackend[_T] = None,
+    ) -> None:
+        self.func = func
+        self.default = default
+        self.version = version
+        self.namespace = namespace
+        self.cache = backend
+        self._in_flight: SingleFlight[str, _T] = SingleFlight()
 
-def get_user(user: User | Member, icon: Optional_[str], name: Optional_[str]) -> EllipsisType | UserMock:
-    if icon is ... and name is ...:
-        return ...
+    async def __call__(self, value: _Id) -> _T:
+        """Customizes one object with a batch of one."""
+        return (await self.many([value]))[value.id]
 
-    icon_ = user.avatar if icon is ... else icon if icon is None else IconMock(icon)
-    name_ = user.display_name if name is ... or name is None else name
+    async def many(self, values: Iterable[_Id]) -> dict[int, _T]:
+        """Customizes values, calling the batch function once with the objects that have no cached result.
 
-    return UserMock(user, icon_, icon_, name_)
+        Returns:
+            dict[int, T]: The result for each id of values.
+        """
+        unique = {value.id: value for value in values}
+        keys = {id_: self._key(value) for id_, value in unique.items()}
+        results: dict[int, _T] = {}
 
+        if self.cache is not None:
+            lookups = [id_ for id_, key in keys.items() if key not in self._in_flight]
+            cached = await asyncio.gather(*(self.cache.get(keys[id_]) for id_ in lookups))
+            results.update((id_, result) for id_, result in zip(lookups, cached, strict=True) if result is not None)
 
-def get_guild(guild: Guild, value: Optional_[str]) -> EllipsisType | GuildMock:
-    if value is not ...:
-        icon = None
-        if value is not None:
-            icon = IconMock(value)
-        return GuildMock(guild, icon)
-    return ...
+        remaining = {keys[id_]: value for id_, value in unique.items() if id_ not in results}
+        if remaining:
+            filled = await self._in_flight.do_many(remaining, partial(self._fill, remaining))
+            results.update((value.id, filled[key]) for key, value in remaining.items())
+        return results
 
+    def _key(self, value: _Id) -> str:
+        version = None if self.version is None else self.version(value)
+        return f'{self.namespace}:{value.id}:{version}'
 
-def _setter(target: Any, name: str, value: Any) -> None:  # noqa: ANN401
-    if value is not ...:
-        setattr(target, name, value)
+    async def _fill(self, values: dict[str, _Id], keys: list[str]) -> dict[str, _T]:
+        misses = [values[key] for key in keys]
+        returned = await maybe_coroutine(self.func, misses)
+        results = {key: returned.get(value.id) or self.default() for key, value in zip(keys, misses, strict=True)}
+        if self.cache is not None:
+            await asyncio.gather(*(self.cache.set(key, result) for key, result in results.items()))
+        return results
 
 
-def cache(func: Callable[Concatenate[Id, P], Awaitable[T] | T]) -> Callable[Concatenate[Id, P], Awaitable[T]]:
-    cache: dict[int, T] = {}
+# shared by every Customizer, so a version is never reused by another instance.
+_versions = count()
 
-    async def inner(value: Id, *args: P.args, **kwargs: P.kwargs) -> T:
-        if value.id in cache:
-            return cache[value.id]
-        returned = await maybe_coroutine(func, value, *args, **kwargs)
-        cache[value.id] = returned
-        return returned
 
-    return inner  # type: ignore[return-value]
+def _message_version(message: Message) -> HashableKey:
+    return message.edited_at
 
 
 class Customizer:
@@ -146,6 +246,12 @@ class Customizer:
     __channel: ChannelCustomizerFunc
     __attachment: AttachmentCustomizerFunc
 
+    def __init__(self) -> None:
+        # component name -> seconds a call may take before the uncustomized value is used.
+        self.timeouts: dict[str, float] = {}
+        # changes whenever a customizer function is replaced, so renders cached by a dispander are not reused.
+        self.version = next(_versions)
+
     @property
     def _message(self) -> MessageCustomizerFunc:
         try:
@@ -161,21 +267,97 @@ class Customizer:
     @_message.setter
     def _message(self, customizer: MessageCustomizerFunc) -> None:
         self.__message: MessageCustomizerFunc = customizer
+        self.version = next(_versions)
 
-    def set_message(self, customizer: MessageCustomizerFunc, *, enable_cache: bool = True) -> Self:
+    def set_message(  # noqa: PLR0913
+        self,
+        customizer: MessageCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[Message], HashableKey] = _message_version,
+        cache_backend: None | CacheBackend[MessageCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
         """Sets the message customizer function.
 
         Args:
             customizer (MessageCustomizerFunc): A function that customizes a message.
             enable_cache (bool, optional): If True, the message will be cached. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[Message], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to ``Message.edited_at``, so an edited message is customized again.
+            cache_backend (CacheBackend[MessageCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the message is left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
 
         Returns:
             Self: The class instance to allow for fluent-style chaining.
         """
         if enable_cache:
-            self._message = cache(customizer)
+            self._message = cache(
+                customizer,
+                maxsize=cache_size,
+                ttl=cache_ttl,
+                version=version,
+                namespace='customizer:message',
+                backend=cache_backend,
+            )
         else:
             self._message = customizer
+        self._set_timeout('message', timeout)
+        return self
+
+    def set_message_batch(  # noqa: PLR0913
+        self,
+        customizer: MessageBatchCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[Message], HashableKey] = _message_version,
+        cache_backend: None | CacheBackend[MessageCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
+        """Sets a batch message customizer function, called once per dispand with every message involved.
+
+        Args:
+            customizer (MessageBatchCustomizerFunc): A function that takes a list of messages and returns a mapping
+                of their ids to MessageCustomized. Messages missing from the mapping are not customized.
+            enable_cache (bool, optional): If True, only messages without a cached result are passed to the
+                function. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[Message], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to ``Message.edited_at``, so an edited message is customized again.
+            cache_backend (CacheBackend[MessageCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the messages are left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
+
+        Returns:
+            Self: The class instance to allow for fluent-style chaining.
+        """
+        backend: None | CacheBackend[MessageCustomized] = None
+        if enable_cache:
+            backend = MemoryCacheBackend(cache_size, cache_ttl) if cache_backend is None else cache_backend
+        self._message = BatchCustomizer(
+            customizer,
+            MessageCustomized,
+            version=version,
+            namespace='customizer:message',
+            backend=backend,
+        )
+        self._set_timeout('message', timeout)
         return self
 
     @property
@@ -193,21 +375,97 @@ class Customizer:
     @_guild.setter
     def _guild(self, customizer: GuildCustomizerFunc) -> None:
         self.__guild = customizer
+        self.version = next(_versions)
 
-    def set_guild(self, customizer: GuildCustomizerFunc, *, enable_cache: bool = True) -> Self:
+    def set_guild(  # noqa: PLR0913
+        self,
+        customizer: GuildCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[Guild], HashableKey] = None,
+        cache_backend: None | CacheBackend[GuildCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
         """Sets the guild customizer function.
 
-        Parameters:
+        Args:
             customizer (GuildCustomizerFunc): A function that customizes a guild.
             enable_cache (bool, optional): If True, caches the customizer function. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[Guild], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to None.
+            cache_backend (CacheBackend[GuildCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the guild is left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
 
         Returns:
             Self: The class instance to allow for fluent-style chaining.
         """
         if enable_cache:
-            self._guild = cache(customizer)
+            self._guild = cache(
+                customizer,
+                maxsize=cache_size,
+                ttl=cache_ttl,
+                version=version,
+                namespace='customizer:guild',
+                backend=cache_backend,
+            )
         else:
             self._guild = customizer
+        self._set_timeout('guild', timeout)
+        return self
+
+    def set_guild_batch(  # noqa: PLR0913
+        self,
+        customizer: GuildBatchCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[Guild], HashableKey] = None,
+        cache_backend: None | CacheBackend[GuildCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
+        """Sets a batch guild customizer function, called once per dispand with every guild involved.
+
+        Args:
+            customizer (GuildBatchCustomizerFunc): A function that takes a list of guilds and returns a mapping
+                of their ids to GuildCustomized. Guilds missing from the mapping are not customized.
+            enable_cache (bool, optional): If True, only guilds without a cached result are passed to the
+                function. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[Guild], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to None.
+            cache_backend (CacheBackend[GuildCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the guilds are left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
+
+        Returns:
+            Self: The class instance to allow for fluent-style chaining.
+        """
+        backend: None | CacheBackend[GuildCustomized] = None
+        if enable_cache:
+            backend = MemoryCacheBackend(cache_size, cache_ttl) if cache_backend is None else cache_backend
+        self._guild = BatchCustomizer(
+            customizer,
+            GuildCustomized,
+            version=version,
+            namespace='customizer:guild',
+            backend=backend,
+        )
+        self._set_timeout('guild', timeout)
         return self
 
     @property
@@ -225,21 +483,97 @@ class Customizer:
     @_channel.setter
     def _channel(self, customizer: ChannelCustomizerFunc) -> None:
         self.__channel = customizer
+        self.version = next(_versions)
 
-    def set_channel(self, customizer: ChannelCustomizerFunc, *, enable_cache: bool = True) -> Self:
+    def set_channel(  # noqa: PLR0913
+        self,
+        customizer: ChannelCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[MessageableChannel], HashableKey] = None,
+        cache_backend: None | CacheBackend[ChannelCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
         """Sets the channel customizer function.
 
-        Parameters:
+        Args:
             customizer (ChannelCustomizerFunc): A function that customizes a channel.
             enable_cache (bool, optional): If True, caches the customizer function. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[MessageableChannel], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to None.
+            cache_backend (CacheBackend[ChannelCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the channel is left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
 
         Returns:
             Self: The class instance to allow for fluent-style chaining.
         """
         if enable_cache:
-            self._channel = cache(customizer)
+            self._channel = cache(
+                customizer,
+                maxsize=cache_size,
+                ttl=cache_ttl,
+                version=version,
+                namespace='customizer:channel',
+                backend=cache_backend,
+            )
         else:
             self._channel = customizer
+        self._set_timeout('channel', timeout)
+        return self
+
+    def set_channel_batch(  # noqa: PLR0913
+        self,
+        customizer: ChannelBatchCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[MessageableChannel], HashableKey] = None,
+        cache_backend: None | CacheBackend[ChannelCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
+        """Sets a batch channel customizer function, called once per dispand with every channel involved.
+
+        Args:
+            customizer (ChannelBatchCustomizerFunc): A function that takes a list of channels and returns a mapping
+                of their ids to ChannelCustomized. Channels missing from the mapping are not customized.
+            enable_cache (bool, optional): If True, only channels without a cached result are passed to the
+                function. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[MessageableChannel], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to None.
+            cache_backend (CacheBackend[ChannelCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the channels are left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
+
+        Returns:
+            Self: The class instance to allow for fluent-style chaining.
+        """
+        backend: None | CacheBackend[ChannelCustomized] = None
+        if enable_cache:
+            backend = MemoryCacheBackend(cache_size, cache_ttl) if cache_backend is None else cache_backend
+        self._channel = BatchCustomizer(
+            customizer,
+            ChannelCustomized,
+            version=version,
+            namespace='customizer:channel',
+            backend=backend,
+        )
+        self._set_timeout('channel', timeout)
         return self
 
     @property
@@ -257,23 +591,120 @@ class Customizer:
     @_attachment.setter
     def _attachment(self, customizer: AttachmentCustomizerFunc) -> None:
         self.__attachment = customizer
+        self.version = next(_versions)
 
-    def set_attachment(self, customizer: AttachmentCustomizerFunc, *, enable_cache: bool = True) -> Self:
+    def set_attachment(  # noqa: PLR0913
+        self,
+        customizer: AttachmentCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[Attachment], HashableKey] = None,
+        cache_backend: None | CacheBackend[AttachmentCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
         """Sets the Attachment customizer function.
 
-        Parameters:
+        Args:
             customizer (AttachmentCustomizerFunc): A function that customizes a Attachment.
             enable_cache (bool, optional): If True, caches the customizer function. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[Attachment], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to None.
+            cache_backend (CacheBackend[AttachmentCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the attachment is left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
 
         Returns:
             Self: The class instance to allow for fluent-style chaining.
         """
         if enable_cache:
-            self._attachment = cache(customizer)
+            self._attachment = cache(
+                customizer,
+                maxsize=cache_size,
+                ttl=cache_ttl,
+                version=version,
+                namespace='customizer:attachment',
+                backend=cache_backend,
+            )
         else:
             self._attachment = customizer
+        self._set_timeout('attachment', timeout)
         return self
 
+    def set_attachment_batch(  # noqa: PLR0913
+        self,
+        customizer: AttachmentBatchCustomizerFunc,
+        *,
+        enable_cache: bool = True,
+        cache_size: int = 1024,
+        cache_ttl: None | float = None,
+        version: None | Callable[[Attachment], HashableKey] = None,
+        cache_backend: None | CacheBackend[AttachmentCustomized] = None,
+        timeout: None | float = None,
+    ) -> Self:
+        """Sets a batch attachment customizer function, called once per dispand with every attachment involved.
+
+        Args:
+            customizer (AttachmentBatchCustomizerFunc): A function that takes a list of attachments and returns
+                a mapping of their ids to AttachmentCustomized. Attachments missing from the mapping are not customized.
+            enable_cache (bool, optional): If True, only attachments without a cached result are passed to the
+                function. Defaults to True.
+            cache_size (int, optional): The maximum number of cached results. Defaults to 1024.
+            cache_ttl (float | None, optional): Seconds a result stays cached. None means no expiry.
+                Defaults to None.
+            version (Callable[[Attachment], Hashable] | None, optional): Cached results are reused
+                only while this returns the same value.
+                Defaults to None.
+            cache_backend (CacheBackend[AttachmentCustomized] | None, optional): Where results are stored, e.g. a
+                :class:`~dispander.backends.SQLiteCacheBackend` shared between processes. cache_size and cache_ttl
+                only apply to the default in-memory backend. Defaults to None.
+            timeout (float | None, optional): Seconds a call may take. When it takes longer, the attachments are left
+                uncustomized and the ``customizer_timeouts`` counter is incremented. Defaults to None.
+
+        Returns:
+            Self: The class instance to allow for fluent-style chaining.
+        """
+        backend: None | CacheBackend[AttachmentCustomized] = None
+        if enable_cache:
+            backend = MemoryCacheBackend(cache_size, cache_ttl) if cache_backend is None else cache_backend
+        self._attachment = BatchCustomizer(
+            customizer,
+            AttachmentCustomized,
+            version=version,
+            namespace='customizer:attachment',
+            backend=backend,
+        )
+        self._set_timeout('attachment', timeout)
+        return self
+
+    def _set_timeout(self, component: str, timeout: None | float) -> None:
+        if timeout is None:
+            self.timeouts.pop(component, None)
+        else:
+            self.timeouts[component] = timeout
+
+    @property
+    def cache_stats(self) -> dict[str, CacheStats]:
+        """Hit, miss and eviction counters of each cached customizer, keyed by component name."""
+        customizers: dict[str, object] = {
+            'message': self._message,
+            'guild': self._guild,
+            'channel': self._channel,
+            'attachment': self._attachment,
+        }
+        return {
+            name: customizer.cache.stats
+            for name, customizer in customizers.items()
+            if isinstance(customizer, (CachedCustomizer, BatchCustomizer)) and customizer.cache is not None
+        }
+
 
 class CustomizableDispander(Dispander):
     """A class that extends Dispander to allow customization by customizers."""
@@ -284,51 +715,110 @@ class CustomizableDispander(Dispander):
         customizer: Customizer,
         delete_reaction_emoji: None | str | Emoji | PartialEmoji = None,
         embed_color: None | int | Colour = None,
+        **options: Unpack[DispanderOptions],
     ) -> None:
-        super().__init__(bot, delete_reaction_emoji, embed_color)
+        super().__init__(bot, delete_reaction_emoji, embed_color, **options)
         self.customizer = customizer
 
-    async def _extract_message(self, message: Message) -> list[Message]:
-        messages = await super()._extract_message(message)
-        customized_messages: list[Message] = []
+    def _render_config_version(self) -> HashableKey:
+        return (super()._render_config_version(), self.customizer.version)
+
+    async def _make_views(self, messages: list[Message]) -> list[tuple[LinkedMessageView, bool]]:
+        guilds: list[Guild] = []
+        channels: list[MessageableChannel] = []
         for message_ in messages:
             assert message_.guild is not None
             assert not isinstance(message_.channel, (DMChannel, GroupChannel, PartialMessageable))  # noqa: UP038
+            guilds.append(message_.guild)
+            channels.append(message_.channel)
+
+        customizer = self.customizer
+        with self.instrumentation.span('customize'):
+            msgs, guilds_, channels_, attachments = await asyncio.gather(
+                self._customize_all('message', customizer._message, messages, MessageCustomized),
+                self._customize_all('guild', customizer._guild, guilds, GuildCustomized),
+                self._customize_all('channel', customizer._channel, channels, ChannelCustomized),
+                self._customize_all(
+                    'attachment',
+                    customizer._attachment,
+                    [attachment for message_ in messages for attachment in message_.attachments],
+                    AttachmentCustomized,
+                ),
+            )
+
+        views: list[tuple[LinkedMessageView, bool]] = []
+        remaining = iter(attachments)
+        for message_, msg, guild, channel in zip(messages, msgs, guilds_, channels_, strict=True):
+            attachments_ = list(islice(remaining, len(message_.attachments)))
+            view = self._apply_customized(
+                LinkedMessageView.from_message(message_),
+                msg[0],
+                guild[0],
+                channel[0],
+                [attachment for attachment, _ in attachments_],
+            )
+            # a view that fell back to a default after a timeout is posted but not cached.
+            complete = all(ok for _, ok in (msg, guild, channel, *attachments_))
+            views.append((view, complete))
+
+        return views
+
+    async def _customize_all(
+        self,
+        component: str,
+        func: MaybeCoroutineFunc[T, U],
+        values: list[T],
+        default: Callable[[], U],
+    ) -> list[tuple[U, bool]]:
+        """Customizes values concurrently, or with one call when func is a BatchCustomizer.
+
+        Each result is paired with False when it is the default used after a timeout.
+        """
+        if isinstance(func, BatchCustomizer):
+            many: tuple[dict[int, U], bool] = await self._customize(component, func.many, values, dict)
+            customized, ok = many
+            return [(customized.get(value.id) or default(), ok) for value in values]  # type: ignore[attr-defined]
+        return await asyncio.gather(*(self._customize(component, func, value, default) for value in values))
 
-            msg = await maybe_coroutine(self.customizer._message, message_)
-            guild = await maybe_coroutine(self.customizer._guild, message_.guild)
-            channel = await maybe_coroutine(self.customizer._channel, message_.channel)
-
-            attachments: list[AttachmentCustomized] = [
-                await maybe_coroutine(self.customizer._attachment, attachment) for attachment in message_.attachments
-            ]
-
-            customized_messages.append(self._replace_message(message_, msg, guild, channel, attachments))
+    async def _customize(
+        self,
+        component: str,
+        func: MaybeCoroutineFunc[T, U],
+        value: T,
+        default: Callable[[], U],
+    ) -> tuple[U, bool]:
+        """Calls one customizer, falling back to default when it exceeds the timeout of its component.
 
-        return customized_messages
+        Returns:
+            tuple[U, bool]: The result, and False when it is the default used after a timeout.
+        """
+        try:
+            return await asyncio.wait_for(maybe_coroutine(func, value), self.customizer.timeouts.get(component)), True
+        except TimeoutError:
+            self.instrumentation.count('customizer_timeouts', customizer=component)
+            return default(), False
 
-    def _replace_message(
+    def _apply_customized(
         self,
-        msg: Message,
+        view: LinkedMessageView,
         extra_msg: MessageCustomized,
         guild: GuildCustomized,
         channel: ChannelCustomized,
         attachments: list[AttachmentCustomized],
-    ) -> Message:
-        _setter(msg, 'content', extra_msg.content)
-        _setter(
-            msg,
-            'author',
-            get_user(msg.author, extra_msg.author_avatar_url, extra_msg.author_name),
+    ) -> LinkedMessageView:
+        author_name = view.author_name if extra_msg.author_name is None else extra_msg.author_name
+        return replace(
+            view,
+            content=_customized(extra_msg.content, view.content),
+            author_name=_customized(author_name, view.author_name),
+            author_icon_url=_customized(extra_msg.author_avatar_url, view.author_icon_url),
+            guild_icon_url=_customized(guild.icon_url, view.guild_icon_url),
+            channel_name=_customized(channel.name, view.channel_name),
+            attachments=tuple(
+                AttachmentView(
+                    _customized(extra.content_type, attachment.content_type),
+                    _customized(extra.proxy_url, attachment.proxy_url),
+                )
+                for attachment, extra in zip(view.attachments, attachments, strict=True)
+            ),
         )
-
-        assert msg.guild is not None
-        _setter(msg, 'guild', get_guild(msg.guild, guild.icon_url))
-
-        _setter(msg.channel, 'name', channel.name)
-
-        for attachment, extra in zip(msg.attachments, attachments, strict=False):
-            _setter(attachment, 'content_type', extra.content_type)
-            _setter(attachment, 'proxy_url', extra.proxy_url)
-
-        return msg
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core import FromJumpUrl
+
+__all__ = ('ExpansionIndex',)
+
+
+class ExpansionIndex:
+    """An in-memory index of the expansions posted by a dispander, keyed by the id of the main message.
+
+    Message ids are snowflakes, so they grow with time. Every expansion posted after the index was created is
+    recorded until it is evicted, which makes the index authoritative for message ids newer than both the first
+    expansion it recorded and its most recently evicted entry. Older ids are unknown and must be checked the slow
+    way. The bound comes from Discord's snowflakes rather than the local clock, which may run behind.
+
+    Expansions recorded with their source message can also be listed by source, so an edit of the source can
+    delete the expansions of the links it removed. A main message can expand several links when they were packed
+    together.
+
+    Args:
+        maxsize (int): The maximum number of recorded expansions. 0 disables the index.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError('maxsize must be zero or more')
+        self.maxsize = maxsize
+        self._data: OrderedDict[int, FromJumpUrl] = OrderedDict()
+        # source message id -> main message id -> (channel id, message id) of each expanded link.
+        self._sources: dict[int, dict[int, tuple[tuple[int, int], ...]]] = {}
+        self._source_of: dict[int, int] = {}
+        # None until the first expansion is recorded; nothing is authoritative before that.
+        self._floor: None | int = None
+
+    def __len__(self) -> int:
+        """The number of recorded expansions."""
+        return len(self._data)
+
+    def add(
+        self,
+        message_id: int,
+        data: FromJumpUrl,
+        source_id: None | int = None,
+        targets: tuple[tuple[int, int], ...] = (),
+    ) -> None:
+        """Records the expansion whose main message is message_id.
+
+        Args:
+            message_id (int): The id of the main message of the expansion.
+            data (FromJumpUrl): The deletion data of the expansion.
+            source_id (int | None, optional): The id of the message whose link was expanded. Defaults to None.
+            targets (tuple[tuple[int, int], ...], optional): The channel id and message id each expanded link
+                points to. Defaults to ().
+        """
+        if self._floor is None:
+            self._floor = message_id - 1
+        if self.maxsize == 0:
+            self._floor = max(self._floor, message_id)
+            return
+        self._data[message_id] = data
+        if source_id is not None and targets:
+            self._sources.setdefault(source_id, {})[message_id] = targets
+            self._source_of[message_id] = source_id
+        while len(self._data) > self.maxsize:
+            evicted, _ = self._data.popitem(last=False)
+            self._forget_source(evicted)
+            self._floor = max(self._floor, evicted)
+
+    def get(self, message_id: int) -> None | FromJumpUrl:
+        """Returns the recorded expansion for message_id, or None."""
+        return self._data.get(message_id)
+
+    def remove(self, message_id: int) -> None:
+        """Forgets the expansion for message_id, e.g. after it was deleted."""
+        self._data.pop(message_id, None)
+        self._forget_source(message_id)
+
+    def expansions_of(self, source_id: int) -> dict[int, tuple[tuple[int, int], ...]]:
+        """Returns the main message id and the link targets of each recorded expansion of source_id."""
+        return dict(self._sources.get(source_id, {}))
+
+    def _forget_source(self, message_id: int) -> None:
+        source_id = self._source_of.pop(message_id, None)
+        if source_id is None:
+            return
+        expansions = self._sources[source_id]
+        del expansions[message_id]
+        if not expansions:
+            del self._sources[source_id]
+
+    def is_authoritative(self, message_id: int) -> bool:
+        """Whether a miss for message_id proves that it is not an expansion.
+
+        It also proves that a source message with this id has no recorded expansion, as an expansion is always
+        posted after its source.
+        """
+        return self._floor is not None and message_id > self._floor
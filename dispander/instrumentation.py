@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__all__ = ('Instrumentation', 'MetricsAggregator')
+
+LabelSet = tuple[tuple[str, str], ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Instrumentation:
+    """The instrumentation surface of Dispander. This base class records nothing.
+
+    Dispander reports these stages to :meth:`span`: ``scan``, ``resolve_channel``, ``fetch_channel``, ``fetch``,
+    ``customize``, ``compose``, ``send``, ``reaction``, ``edit`` and ``delete``.
+    It reports these counters to :meth:`count`: ``api_calls`` (labelled by ``call``), ``cache_hits``
+    (labelled by ``source``), ``expansions``, ``embeds``, ``skipped_links`` (labelled by ``status``),
+    ``suppressed_links``, ``previews`` and ``customizer_timeouts`` (labelled by ``customizer``).
+    :class:`MetricsAggregator` also counts ``failures`` (labelled by ``stage`` and ``exception``).
+    """
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:  # noqa: ARG002 # no-op default
+        """Times the enclosed block as one run of stage."""
+        yield
+
+    def count(self, name: str, value: int = 1, **labels: str) -> None:
+        """Adds value to the counter name."""
+
+
+class MetricsAggregator(Instrumentation):
+    """An in-process Instrumentation that aggregates spans and counters and exports them for Prometheus.
+
+    Args:
+        buckets (tuple[float, ...], optional): Upper bounds, in seconds, of the stage duration histogram.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counters: defaultdict[tuple[str, LabelSet], int] = defaultdict(int)
+        # stage -> (count per bucket, with one more for +Inf; sum of seconds)
+        self.durations: dict[str, tuple[list[int], float]] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Times the enclosed block as one run of stage, and counts the exception type if it fails."""
+        start = perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.count('failures', stage=stage, exception=type(e).__name__)
+            raise
+        finally:
+            self.observe(stage, perf_counter() - start)
+
+    def count(self, name: str, value: int = 1, **labels: str) -> None:
+        """Adds value to the counter name."""
+        self.counters[name, tuple(sorted(labels.items()))] += value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Records one run of stage that took seconds."""
+        buckets, total = self.durations.get(stage) or ([0] * (len(self.buckets) + 1), 0.0)
+        buckets[bisect_left(self.buckets, seconds)] += 1
+        self.durations[stage] = (buckets, total + seconds)
+
+    def export_prometheus(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        by_name: defaultdict[str, list[tuple[LabelSet, int]]] = defaultdict(list)
+        for (name, labels), value in sorted(self.counters.items()):
+            by_name[name].append((labels, value))
+        for name, samples in by_name.items():
+            lines.append(f'# TYPE dispander_{name}_total counter')
+            lines.extend(f'dispander_{name}_total{_format_labels(labels)} {value}' for labels, value in samples)
+
+        if self.durations:
+            lines.append('# TYPE dispander_stage_duration_seconds histogram')
+        for stage, (buckets, total) in sorted(self.durations.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), buckets, strict=True):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                labels = _format_labels((('le', le), ('stage', stage)))
+                lines.append(f'dispander_stage_duration_seconds_bucket{labels} {cumulative}')
+            labels = _format_labels((('stage', stage),))
+            lines.append(f'dispander_stage_duration_seconds_sum{labels} {total}')
+            lines.append(f'dispander_stage_duration_seconds_count{labels} {cumulative}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ''
+    escaped = ((key, value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')) for key, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from discord import Embed
+
+__all__ = ('MAX_DESCRIPTION', 'MAX_EMBEDS', 'MAX_MESSAGE_CHARACTERS', 'EmbedPack', 'fit_embed', 'pack_embeds')
+
+# the limits Discord enforces on the embeds of one message.
+MAX_EMBEDS = 10
+MAX_MESSAGE_CHARACTERS = 6000
+MAX_DESCRIPTION = 4096
+
+_ELLIPSIS = '…'
+
+
+@dataclass(frozen=True, slots=True)
+class EmbedPack:
+    """The messages that post one or more expansions together, and are deleted together.
+
+    ``expansions`` holds the indexes of the packed expansions in the input of :func:`pack_embeds`.
+    """
+
+    expansions: tuple[int, ...]
+    messages: tuple[tuple[Embed, ...], ...]
+
+
+def fit_embed(embed: Embed, max_characters: int = MAX_MESSAGE_CHARACTERS) -> Embed:
+    """Returns embed, or a copy with its description truncated so that it can be sent alone.
+
+    The embed itself is never modified, as rendered embeds are shared through the render cache.
+    """
+    description = embed.description or ''
+    excess = max(len(embed) - max_characters, len(description) - MAX_DESCRIPTION)
+    if excess <= 0:
+        return embed
+    keep = len(description) - excess - len(_ELLIPSIS)
+    if keep < 0:
+        # the other fields alone exceed the limit; Discord rejects the embed whatever the description is.
+        return embed
+    embed = embed.copy()
+    embed.description = description[:keep].rstrip() + _ELLIPSIS
+    return embed
+
+
+def _split(embeds: list[Embed]) -> list[tuple[Embed, ...]]:
+    messages: list[tuple[Embed, ...]] = []
+    current: list[Embed] = []
+    characters = 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (len(current) == MAX_EMBEDS or characters + size > MAX_MESSAGE_CHARACTERS):
+            messages.append(tuple(current))
+            current, characters = [], 0
+        current.append(embed)
+        characters += size
+    if current:
+        messages.append(tuple(current))
+    return messages
+
+
+def pack_embeds(expansions: Sequence[Sequence[Embed]], *, merge: bool = True) -> list[EmbedPack]:
+    """Packs the embeds of the expansions of one message into messages within Discord's limits.
+
+    Each message holds at most 10 embeds of at most 6000 characters in total. An expansion that fits in one
+    message is never split, and an expansion that does not is split between its embeds over consecutive messages
+    of its own. With merge, expansions that fit are added to the previous message while it has room, so the
+    link order is kept. Expansions without embeds are skipped.
+
+    Args:
+        expansions (Sequence[Sequence[Embed]]): The embeds of each expansion, in link order.
+        merge (bool, optional): Whether several expansions may share a message. Defaults to True.
+
+    Returns:
+        list[EmbedPack]: The packs in posting order.
+    """
+    packs: list[EmbedPack] = []
+    indexes: list[int] = []
+    current: list[Embed] = []
+    characters = 0
+    for index, expansion in enumerate(expansions):
+        embeds = [fit_embed(embed) for embed in expansion]
+        if not embeds:
+            continue
+        size = sum(len(embed) for embed in embeds)
+        fits = len(embeds) <= MAX_EMBEDS and size <= MAX_MESSAGE_CHARACTERS
+        if (
+            merge
+            and fits
+            and current
+            and len(current) + len(embeds) <= MAX_EMBEDS
+            and characters + size <= MAX_MESSAGE_CHARACTERS
+        ):
+            indexes.append(index)
+            current.extend(embeds)
+            characters += size
+            continue
+
+        if current:
+            packs.append(EmbedPack(tuple(indexes), (tuple(current),)))
+            indexes, current, characters = [], [], 0
+        if merge and fits:
+            indexes, current, characters = [index], embeds, size
+        else:
+            packs.append(EmbedPack((index,), tuple(_split(embeds))))
+    if current:
+        packs.append(EmbedPack(tuple(indexes), (tuple(current),)))
+    return packs
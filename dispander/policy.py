@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import monotonic
+
+from .cache import LRUCache
+
+__all__ = ('ExpansionPolicy', 'PolicyStats')
+
+
+@dataclass
+class PolicyStats:
+    """Counters reported by an ExpansionPolicy."""
+
+    allowed: int = 0
+    debounced: int = 0
+    user_limited: int = 0
+    channel_limited: int = 0
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    updated_at: float
+
+
+class ExpansionPolicy:
+    """Decides which links of a message dispander expands, to stop link spam and bot loops.
+
+    A target message expanded in a channel is not expanded there again until ``window`` seconds have passed.
+    Each user and each channel also has a budget of expansions, refilled evenly over ``period`` seconds.
+    Suppressed links are dropped before their messages are fetched, so they cost no API calls.
+
+    Args:
+        window (float, optional): Seconds during which the same target is not expanded again in a channel.
+            0 disables the debounce. Defaults to 30.0.
+        user_limit (int | None, optional): The number of expansions a user may trigger per period.
+            None means no limit. Defaults to None.
+        channel_limit (int | None, optional): The number of expansions per channel per period.
+            None means no limit. Defaults to None.
+        period (float, optional): Seconds over which the budgets are refilled. Defaults to 60.0.
+        maxsize (int, optional): The maximum number of targets, users and channels tracked each. Defaults to 10000.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: float = 30.0,
+        user_limit: None | int = None,
+        channel_limit: None | int = None,
+        period: float = 60.0,
+        maxsize: int = 10000,
+    ) -> None:
+        if window < 0:
+            raise ValueError('window must be zero or more')
+        if period <= 0:
+            raise ValueError('period must be positive')
+        if (user_limit is not None and user_limit < 1) or (channel_limit is not None and channel_limit < 1):
+            raise ValueError('limits must be at least one')
+        self.window = window
+        self.user_limit = user_limit
+        self.channel_limit = channel_limit
+        self.period = period
+        self.stats = PolicyStats()
+        # (channel id, target message id) of recent expansions.
+        self._recent: LRUCache[tuple[int, int], bool] = LRUCache(maxsize if window else 0, window or None)
+        self._users: LRUCache[int, _Bucket] = LRUCache(maxsize)
+        self._channels: LRUCache[int, _Bucket] = LRUCache(maxsize)
+
+    def allow(self, channel_id: int, user_id: int, message_id: int) -> bool:
+        """Whether a link to message_id posted by user_id in channel_id is expanded. An allowed link is recorded."""
+        if (channel_id, message_id) in self._recent:
+            self.stats.debounced += 1
+            return False
+
+        now = monotonic()
+        user = self._refill(self._users, user_id, self.user_limit, now)
+        if user is not None and user.tokens < 1:
+            self.stats.user_limited += 1
+            return False
+        channel = self._refill(self._channels, channel_id, self.channel_limit, now)
+        if channel is not None and channel.tokens < 1:
+            self.stats.channel_limited += 1
+            return False
+
+        # spend from the budgets only once every check passed.
+        if user is not None:
+            user.tokens -= 1
+        if channel is not None:
+            channel.tokens -= 1
+        self._recent.set((channel_id, message_id), True)
+        self.stats.allowed += 1
+        return True
+
+    def _refill(self, buckets: LRUCache[int, _Bucket], key: int, limit: None | int, now: float) -> None | _Bucket:
+        if limit is None:
+            return None
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(float(limit), now)
+            buckets.set(key, bucket)
+            return bucket
+        bucket.tokens = min(float(limit), bucket.tokens + (now - bucket.updated_at) * limit / self.period)
+        bucket.updated_at = now
+        return bucket
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import monotonic
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from discord.utils import time_snowflake, utcnow
+
+from .core import FromJumpUrl
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import timedelta
+    from os import PathLike
+
+__all__ = ('SQLiteExpansionRegistry',)
+
+T = TypeVar('T')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS expansions (
+    message_id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    source_message_id INTEGER NOT NULL,
+    base_author_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    extra_messages TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS expansions_source_message_id ON expansions (source_message_id);
+"""
+
+
+class SQLiteExpansionRegistry:
+    """A durable record of posted expansions, stored with the standard library sqlite3 module.
+
+    Every database call runs on one dedicated thread, so the event loop never blocks on disk I/O.
+    Writes are buffered and flushed in batches; lookups see buffered writes immediately.
+    Rows are keyed by the snowflake id of the main message, so expiring them needs no extra column.
+
+    Args:
+        path (str | PathLike[str]): The database file. ``':memory:'`` keeps it in memory.
+        retention (timedelta): How long an expansion stays deletable through the registry.
+        batch_size (int, optional): The number of buffered writes that triggers a flush. Defaults to 100.
+        flush_interval (float, optional): The maximum seconds a write stays buffered. Defaults to 1.0.
+    """
+
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        retention: timedelta,
+        *,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+    ) -> None:
+        self.path = path
+        self.retention = retention
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='dispander-registry')
+        self._connection: None | sqlite3.Connection = None
+        # message_id -> row to insert, or None to delete.
+        self._pending: dict[int, None | tuple[int, int, int, int, int, str]] = {}
+        self._flush_handle: None | asyncio.TimerHandle = None
+        self._flush_tasks: set[asyncio.Task[None]] = set()
+        self._last_purge = monotonic()
+
+    def add(self, message_id: int, channel_id: int, source_message_id: int, data: FromJumpUrl) -> None:
+        """Records an expansion. The write is buffered."""
+        extra = ','.join(str(id_) for id_ in data.extra_messages)
+        self._pending[message_id] = (
+            message_id,
+            channel_id,
+            source_message_id,
+            data.base_author_id,
+            data.author_id,
+            extra,
+        )
+        self._schedule_flush()
+
+    def remove(self, message_id: int) -> None:
+        """Forgets an expansion. The write is buffered."""
+        self._pending[message_id] = None
+        self._schedule_flush()
+
+    async def get(self, message_id: int) -> None | tuple[int, FromJumpUrl]:
+        """Returns the channel id and deletion data of the expansion whose main message is message_id."""
+        if message_id in self._pending:
+            row = self._pending[message_id]
+        else:
+            row = await self._run(self._select, message_id)
+        if row is None or row[0] <= self._expiry_floor():
+            return None
+        _, channel_id, _, base_author_id, author_id, extra = row
+        return channel_id, FromJumpUrl(
+            base_author_id=base_author_id,
+            author_id=author_id,
+            extra_messages=[int(id_) for id_ in extra.split(',')] if extra else [],
+        )
+
+    async def flush(self) -> None:
+        """Writes every buffered change, and purges expired rows at most once an hour."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        purge_before = None
+        if monotonic() - self._last_purge > 3600:
+            self._last_purge = monotonic()
+            purge_before = self._expiry_floor()
+        if pending or purge_before is not None:
+            await self._run(self._write, pending, purge_before)
+
+    async def close(self) -> None:
+        """Flushes buffered writes and closes the database."""
+        await asyncio.gather(*self._flush_tasks)
+        await self.flush()
+        await self._run(self._close)
+        self._executor.shutdown()
+
+    def _expiry_floor(self) -> int:
+        return time_snowflake(utcnow() - self.retention)
+
+    def _schedule_flush(self) -> None:
+        if len(self._pending) >= self.batch_size:
+            self._start_flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_interval, self._start_flush)
+
+    def _start_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:  # noqa: ANN401
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(func, *args))
+
+    # the methods below run on the registry thread.
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def _select(self, message_id: int) -> None | tuple[int, int, int, int, int, str]:
+        cursor = self._connect().execute('SELECT * FROM expansions WHERE message_id = ?', (message_id,))
+        return cursor.fetchone()  # type: ignore[no-any-return]
+
+    def _write(self, pending: dict[int, None | tuple[int, int, int, int, int, str]], purge_before: None | int) -> None:
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO expansions VALUES (?, ?, ?, ?, ?, ?)',
+                [row for row in pending.values() if row is not None],
+            )
+            connection.executemany(
+                'DELETE FROM expansions WHERE message_id = ?',
+                [(message_id,) for message_id, row in pending.items() if row is None],
+            )
+            if purge_before is not None:
+                connection.execute('DELETE FROM expansions WHERE message_id <= ?', (purge_before,))
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, Literal, TypeVar
+
+from discord.errors import HTTPException
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+__all__ = ('OutboundScheduler', 'OverflowPolicy', 'SchedulerStats', 'WriteDroppedError')
+
+_log = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+OverflowPolicy = Literal['drop_new', 'drop_oldest']
+
+
+class WriteDroppedError(Exception):
+    """Raised to the submitter of a job that was shed by the scheduler."""
+
+
+@dataclass
+class SchedulerStats:
+    """Counters reported by an OutboundScheduler."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+    retries: int = 0
+
+
+@dataclass
+class _Job(Generic[T]):
+    func: Callable[[], Awaitable[T]]
+    future: asyncio.Future[T]
+
+
+class OutboundScheduler:
+    """Runs dispander's writes through one FIFO queue per channel.
+
+    Each channel is served by at most one worker, so writes to a channel never race each other for the
+    channel's rate limit bucket, and at most ``max_workers`` channels are written to at once.
+
+    Args:
+        max_workers (int, optional): The maximum number of channels written to concurrently. Defaults to 4.
+        queue_size (int, optional): The maximum number of queued jobs per channel. Defaults to 50.
+        overflow (OverflowPolicy, optional): What to shed when a channel queue is full. ``'drop_new'`` rejects
+            the new job, ``'drop_oldest'`` drops the oldest queued job. Defaults to ``'drop_new'``.
+        max_retries (int, optional): How many times :meth:`retry` retries a 429 or 5xx response. Defaults to 3.
+        base_delay (float, optional): The backoff before the first retry, in seconds. Defaults to 0.5.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 4,
+        queue_size: int = 50,
+        overflow: OverflowPolicy = 'drop_new',
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+    ) -> None:
+        if max_workers < 1:
+            raise ValueError('max_workers must be at least one')
+        if queue_size < 1:
+            raise ValueError('queue_size must be at least one')
+        self.queue_size = queue_size
+        self.overflow: OverflowPolicy = overflow
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.stats = SchedulerStats()
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self._queues: dict[int, deque[_Job[Any]]] = {}
+        self._workers: dict[int, asyncio.Task[None]] = {}
+        self._closing = False
+
+    def submit(self, channel_id: int, func: Callable[[], Awaitable[T]]) -> asyncio.Future[T]:
+        """Queues func to run after the jobs already queued for channel_id.
+
+        Returns:
+            asyncio.Future[T]: Resolves with the result of func.
+
+        Raises:
+            WriteDroppedError: The scheduler is closing, or the queue is full and the policy is ``'drop_new'``.
+        """
+        if self._closing:
+            raise WriteDroppedError('scheduler is closed')
+
+        queue = self._queues.setdefault(channel_id, deque())
+        if len(queue) >= self.queue_size:
+            self.stats.dropped += 1
+            if self.overflow == 'drop_new':
+                raise WriteDroppedError(f'queue for channel {channel_id} is full')
+            dropped = queue.popleft()
+            if not dropped.future.done():
+                dropped.future.set_exception(WriteDroppedError(f'queue for channel {channel_id} is full'))
+
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        queue.append(_Job(func, future))
+        self.stats.submitted += 1
+        if channel_id not in self._workers:
+            self._workers[channel_id] = asyncio.create_task(self._work(channel_id, queue))
+        return future
+
+    async def run(self, channel_id: int, func: Callable[[], Awaitable[T]]) -> T:
+        """Submits func and waits for its result."""
+        return await self.submit(channel_id, func)
+
+    async def retry(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Calls func, retrying 429 and 5xx responses with jittered exponential backoff."""
+        for attempt in range(self.max_retries):
+            try:
+                return await func()
+            except HTTPException as e:
+                if e.status != 429 and e.status < 500:
+                    raise
+                delay = self.base_delay * 2**attempt * random.uniform(0.5, 1.5)  # noqa: S311
+                self.stats.retries += 1
+                _log.debug('retrying a write in %.2fs after HTTP %d', delay, e.status)
+                await asyncio.sleep(delay)
+        return await func()
+
+    async def close(self, grace_period: None | float = None) -> None:
+        """Stops accepting jobs and waits for the queued ones to finish.
+
+        Args:
+            grace_period (float | None, optional): Seconds to wait before the remaining jobs are cancelled.
+                None waits until every queue is drained. Defaults to None.
+        """
+        self._closing = True
+        workers = list(self._workers.values())
+        if not workers:
+            return
+        _, pending = await asyncio.wait(workers, timeout=grace_period)
+        for worker in pending:
+            worker.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _work(self, channel_id: int, queue: deque[_Job[Any]]) -> None:
+        try:
+            while queue:
+                job = queue.popleft()
+                if job.future.done():
+                    continue
+                async with self._semaphore:
+                    try:
+                        result = await job.func()
+                    except asyncio.CancelledError:
+                        job.future.cancel()
+                        raise
+                    except Exception as e:  # noqa: BLE001 # the submitter handles it
+                        self.stats.failed += 1
+                        if not job.future.done():
+                            job.future.set_exception(e)
+                    else:
+                        self.stats.completed += 1
+                        if not job.future.done():
+                            job.future.set_result(result)
+        finally:
+            for job in queue:
+                job.future.cancel()
+            queue.clear()
+            del self._workers[channel_id]
+            del self._queues[channel_id]